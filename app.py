@@ -1,15 +1,29 @@
 import os
 import json
-from datetime import timedelta
+import base64
+from datetime import datetime, timedelta
 from flask import Flask, jsonify, request
-from flask_jwt_extended import create_access_token, jwt_required, JWTManager
-from passlib.hash import pbkdf2_sha256
+from flask_jwt_extended import create_access_token, jwt_required
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy 
+from werkzeug.middleware.proxy_fix import ProxyFix
+from sqlalchemy import and_, case, func, or_, update
+
+from autenticacao import (CacheTokens, JWTManagerComCache, LimitadorTentativas, LoginSobrecarregado,
+                          VerificadorSenhas, criar_contexto_senhas)
+from banco import configurar_banco, instalar_sessao_leitura, sessao_leitura
 
 # Inicialização da Aplicação
 app = Flask(__name__)
-CORS(app) # Habilita CORS para todas as rotas
+
+# Atrás do proxy do Render, request.remote_addr seria o IP do proxy: o IP real
+# vem do X-Forwarded-For. PROXIES_CONFIAVEIS = quantos proxies na frente do app
+# (0 quando exposto direto; senão o cabeçalho poderia ser forjado pelo cliente)
+app.config["PROXIES_CONFIAVEIS"] = int(os.environ.get("PROXIES_CONFIAVEIS", 1))
+if app.config["PROXIES_CONFIAVEIS"]:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config["PROXIES_CONFIAVEIS"],
+                            x_proto=app.config["PROXIES_CONFIAVEIS"])
+CORS(app, expose_headers=["X-Proximo-Cursor", "ETag"]) # Habilita CORS para todas as rotas
 
 # ---------------------------------------------
 # CONFIGURAÇÃO DE SEGURANÇA E BANCO DE DADOS
@@ -18,75 +32,100 @@ CORS(app) # Habilita CORS para todas as rotas
 # Chave Secreta para JWT (Lê da variável de ambiente no Render)
 app.config["JWT_SECRET_KEY"] = os.environ.get("JWT_SECRET_KEY", "SUA_CHAVE_SECRETA_PADRAO")
 app.config["JWT_ACCESS_TOKEN_EXPIRES"] = timedelta(hours=1)
-jwt = JWTManager(app)
+
+# Claims de tokens já verificados ficam em cache por alguns segundos (0 desliga)
+app.config["JWT_CACHE_TTL"] = int(os.environ.get("JWT_CACHE_TTL", 60))
+app.config["JWT_CACHE_MAX"] = int(os.environ.get("JWT_CACHE_MAX", 10000))
+jwt = JWTManagerComCache(app, cache_tokens=CacheTokens(ttl=app.config["JWT_CACHE_TTL"],
+                                                       max_tokens=app.config["JWT_CACHE_MAX"]))
+
+# Política de hash das senhas (hashes fora dela são refeitos no próximo login)
+app.config["SENHA_ESQUEMA"] = os.environ.get("SENHA_ESQUEMA", "pbkdf2_sha256")
+app.config["SENHA_ROUNDS"] = int(os.environ.get("SENHA_ROUNDS", 29000))
+
+# Login: verificação de senha em pool limitado e limite de falhas por usuário+IP e por IP.
+# LOGIN_MAX_PENDENTES fica abaixo das threads do waitress (WAITRESS_THREADS, ver banco.py):
+# logins esperando a verificação não podem ocupar todas as threads do servidor
+app.config["LOGIN_THREADS"] = int(os.environ.get("LOGIN_THREADS", 2))
+app.config["LOGIN_MAX_PENDENTES"] = int(os.environ.get(
+    "LOGIN_MAX_PENDENTES", max(1, int(os.environ.get("WAITRESS_THREADS", 8)) // 2)))
+app.config["LOGIN_MAX_FALHAS"] = int(os.environ.get("LOGIN_MAX_FALHAS", 10)) # por usuário+IP
+app.config["LOGIN_MAX_FALHAS_IP"] = int(os.environ.get("LOGIN_MAX_FALHAS_IP", 50)) # por IP, qualquer usuário
+app.config["LOGIN_JANELA_FALHAS"] = int(os.environ.get("LOGIN_JANELA_FALHAS", 300)) # segundos
+
+verificador_senhas = VerificadorSenhas(
+    criar_contexto_senhas(app.config["SENHA_ESQUEMA"], app.config["SENHA_ROUNDS"]),
+    max_threads=app.config["LOGIN_THREADS"],
+    max_pendentes=app.config["LOGIN_MAX_PENDENTES"],
+)
+limitador_login = LimitadorTentativas(
+    max_falhas=app.config["LOGIN_MAX_FALHAS"],
+    janela=app.config["LOGIN_JANELA_FALHAS"],
+)
+limitador_ip = LimitadorTentativas(
+    max_falhas=app.config["LOGIN_MAX_FALHAS_IP"],
+    janela=app.config["LOGIN_JANELA_FALHAS"],
+)
 
 # Configuração do Banco de Dados PostgreSQL
-# Lê a DATABASE_URL da variável de ambiente no Render
-app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get("DATABASE_URL")
+# Lê a DATABASE_URL da variável de ambiente no Render. Pool dimensionado pelas
+# threads do waitress (WAITRESS_THREADS); réplica opcional em DATABASE_URL_LEITURA (ver banco.py)
+configurar_banco(app, os.environ)
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False 
 
 # Inicializa o SQLAlchemy
 db = SQLAlchemy(app)
+instalar_sessao_leitura(app)
 
 # Importa os modelos APÓS a inicialização do 'db'
-from models import Cliente, Categoria 
+from models import Cliente, Categoria, Documento, Usuario 
+from bucket import criar_armazenamento, prefixo_cliente
+from cache_bucket import CacheListagem
+from cache_respostas import CacheRespostas
+from metricas import Metricas, instalar as instalar_metricas
 
-# SIMULAÇÃO DE USUÁRIOS (Senha de teste: '123456')
-USUARIO_TESTE = {
-    "username": "auditoria",
-    "password_hash": "$pbkdf2-sha256$29000$.j/HuJeScu4dY0xJidEaQw$AOydwozsEvwPgCTORrIOzup7Nj7.iLnXvva..N3zUQA"
-}
+# Armazenamento dos arquivos enviados pelos clientes (json:<arquivo> | local:<pasta> | gcs:<bucket>)
+# Padrão: simulação do GCS em data/arquivos_simulados_gcs.json
+app.config["ARMAZENAMENTO_BUCKET"] = os.environ.get("ARMAZENAMENTO_BUCKET", "json:data/arquivos_simulados_gcs.json")
 
-# ---------------------------------------------
-# FUNÇÃO DE INICIALIZAÇÃO E MIGRAÇÃO DE DADOS
-# ---------------------------------------------
+# Cache das listagens do bucket por prefixo de cliente (ver cache_bucket.py)
+app.config["BUCKET_CACHE_TTL"] = int(os.environ.get("BUCKET_CACHE_TTL", 300)) # segundos
+app.config["BUCKET_CACHE_MEMORIA_MB"] = int(os.environ.get("BUCKET_CACHE_MEMORIA_MB", 64))
+app.config["BUCKET_CACHE_MAX_PREFIXOS"] = int(os.environ.get("BUCKET_CACHE_MAX_PREFIXOS", 1000))
 
-def inicializar_banco_de_dados():
-    """Cria as tabelas e popula com dados do JSON se o banco estiver vazio."""
-    with app.app_context():
-        # 1. Cria as tabelas (se elas já existirem, este comando ignora)
-        db.create_all()
-        
-        # 2. Verifica se o banco já está populado
-        if Cliente.query.count() == 0:
-            print(">>> Banco de dados vazio. Iniciando carga de dados mestres...")
-            
-            try:
-                # Carrega dados do JSON
-                with open('data/dados_mestres.json', 'r', encoding='utf-8') as f:
-                    data_clientes = json.load(f)
-            except FileNotFoundError:
-                print("ERRO: Arquivo data/dados_mestres.json não encontrado. Verifique o caminho.")
-                return
-
-            for cliente_data in data_clientes:
-                # Cria o Cliente
-                novo_cliente = Cliente(
-                    nome=cliente_data['nome'],
-                    grupo=cliente_data['grupo'],
-                    segmento=cliente_data['segmento']
-                )
-                db.session.add(novo_cliente)
-                db.session.flush() # Obtém o ID do cliente
-
-                # Cria as Categorias
-                for cat_data in cliente_data['categorias']:
-                    nova_categoria = Categoria(
-                        cliente_id=novo_cliente.id,
-                        nome_categoria=cat_data['nome'], # CORRIGIDO: Usa a chave 'nome' do JSON
-                        status_recebimento=cat_data.get('status_recebimento', 'PENDENTE'),
-                        detalhes_documentos=cat_data['documentos'] # CORRIGIDO: Usa a chave 'documentos' do JSON
-                    )
-                    db.session.add(nova_categoria)
-            
-            # Salva todas as alterações no banco de dados
-            db.session.commit()
-            print(">>> Carga de dados concluída com sucesso!")
-        else:
-            print(">>> Tabelas já existem e estão populadas. Pulando a carga inicial.")
+try:
+    verificador_bucket = CacheListagem(
+        criar_armazenamento(app.config["ARMAZENAMENTO_BUCKET"]),
+        ttl=app.config["BUCKET_CACHE_TTL"],
+        memoria_maxima=app.config["BUCKET_CACHE_MEMORIA_MB"] * 1024 * 1024,
+        max_prefixos=app.config["BUCKET_CACHE_MAX_PREFIXOS"],
+    )
+except (OSError, ValueError, RuntimeError) as e:
+    # Sem armazenamento, os documentos aparecem como BUCKET_INDISPONIVEL (nunca como encontrados)
+    print(f"AVISO: Armazenamento do bucket indisponível ({e}). Documentos sem verificação.")
+    verificador_bucket = None
+
+# Respostas já renderizadas das rotas de leitura, validadas pelo ETag (ver cache_respostas.py)
+cache_respostas = CacheRespostas(max_entradas=int(os.environ.get("CACHE_RESPOSTAS_MAX", 512)))
+
+# Métricas por rota em GET /metrics (ver metricas.py). Requisições com mais
+# consultas que o orçamento geram um aviso no log.
+app.config["METRICAS_ORCAMENTO_CONSULTAS"] = int(os.environ.get("METRICAS_ORCAMENTO_CONSULTAS", 10))
+# Token fixo para o coletor (Prometheus) no /metrics; sem ele, o /metrics exige um JWT como as demais rotas
+app.config["METRICAS_TOKEN"] = os.environ.get("METRICAS_TOKEN")
 
-# Executa a função na inicialização do servidor
-inicializar_banco_de_dados()
+metricas = Metricas(orcamento_consultas=app.config["METRICAS_ORCAMENTO_CONSULTAS"])
+metricas.registrar_coletor("cache_tokens", lambda: {"acertos": jwt.cache_tokens.acertos,
+                                                    "falhas": jwt.cache_tokens.falhas})
+if verificador_bucket:
+    metricas.registrar_coletor("cache_bucket", verificador_bucket.estatisticas)
+instalar_metricas(app, metricas, token=app.config["METRICAS_TOKEN"])
+
+# A criação das tabelas e a carga dos dados mestres não acontecem mais na
+# inicialização (cada worker do waitress repetia o trabalho). Use:
+#   python importar_dados.py data/dados_mestres.json
+# Usuários são criados com:
+#   python gerenciar_usuarios.py criar <username>
 
 # ---------------------------------------------
 # ROTAS DA API
@@ -94,84 +133,343 @@ inicializar_banco_de_dados()
 
 @app.route("/login", methods=["POST"])
 def login():
-    data = request.get_json()
+    data = request.get_json(silent=True) or {}
     username = data.get("username")
     password = data.get("password")
 
-    if username == USUARIO_TESTE["username"] and \
-       pbkdf2_sha256.verify(password, USUARIO_TESTE["password_hash"]):
-        
-        access_token = create_access_token(identity=username)
-        return jsonify(access_token=access_token)
-    else:
+    if not isinstance(username, str) or not isinstance(password, str):
         return jsonify({"msg": "Nome de usuário ou senha incorretos"}), 401
 
+    # Sem bloqueio pelo usuário sozinho: qualquer um poderia travar a conta de outro
+    chave_usuario = f"{username}|{request.remote_addr}"
+    if not limitador_login.permitido(chave_usuario) or not limitador_ip.permitido(request.remote_addr):
+        return jsonify({"msg": "Muitas tentativas. Aguarde alguns minutos."}), 429
+
+    usuario = Usuario.query.filter_by(username=username, ativo=True).first()
+    # Sem usuário, verifica contra um hash fictício para manter o mesmo tempo de resposta
+    hash_senha = usuario.password_hash if usuario else verificador_senhas.hash_ficticio()
+
+    try:
+        senha_ok, novo_hash = verificador_senhas.verificar(password, hash_senha)
+    except LoginSobrecarregado:
+        return jsonify({"msg": "Servidor ocupado. Tente novamente."}), 503
+
+    if not usuario or not senha_ok:
+        limitador_login.registrar_falha(chave_usuario)
+        limitador_ip.registrar_falha(request.remote_addr)
+        return jsonify({"msg": "Nome de usuário ou senha incorretos"}), 401
+
+    if novo_hash:
+        # Hash fora da política atual: regrava com o esquema/rounds configurados
+        try:
+            usuario.password_hash = novo_hash
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Erro ao atualizar o hash do usuário {username}: {e}")
+
+    limitador_login.limpar(chave_usuario)
+    access_token = create_access_token(identity=username)
+    return jsonify(access_token=access_token)
+
 
 # ROTA 1: LISTAR TODOS OS CLIENTES (Lendo do Banco de Dados)
+# Colunas aceitas em ?ordenar= (as duas últimas são agregados, filtradas via HAVING)
+CAMPOS_ORDENACAO_CLIENTES = ("id", "nome", "grupo", "segmento", "total_categorias", "concluidas")
+LIMITE_MAXIMO_CLIENTES = 500
+
+
+# Campos de ordenação com valor inteiro; os demais são texto
+CAMPOS_ORDENACAO_INTEIROS = ("id", "total_categorias", "concluidas")
+
+
+def _codificar_cursor(ordenar, direcao, valor, cliente_id):
+    """
+    Serializa a posição (valor da ordenação, id) de um cliente em um cursor opaco.
+    A ordenação vai junto: o cursor só vale para a mesma ordenar/direcao.
+    """
+    bruto = json.dumps([ordenar, direcao, valor, cliente_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(bruto).decode("ascii")
+
+
+def _decodificar_cursor(cursor, ordenar, direcao):
+    """
+    Inverso de _codificar_cursor. Retorna None se o cursor for inválido, de outra
+    ordenação ou com um valor de tipo diferente do da coluna ordenada.
+    """
+    try:
+        ordenar_cursor, direcao_cursor, valor, cliente_id = json.loads(
+            base64.urlsafe_b64decode(cursor.encode("ascii"))
+        )
+    except (ValueError, TypeError):
+        return None
+
+    if (ordenar_cursor, direcao_cursor) != (ordenar, direcao):
+        return None
+    tipo = int if ordenar in CAMPOS_ORDENACAO_INTEIROS else str
+    # bool é subclasse de int no Python, mas não é um valor válido aqui
+    if type(valor) is not tipo or type(cliente_id) is not int:
+        return None
+    return valor, cliente_id
+
+
 @app.route("/api/clientes", methods=["GET"])
 @jwt_required()
 def clientes():
-    # Consulta todos os clientes
-    todos_clientes = Cliente.query.all()
-    
-    lista_clientes = []
-    for cliente in todos_clientes:
-        # Calcula o total de categorias e as concluídas usando a relação
-        total_categorias = cliente.categorias.count()
-        concluidas = cliente.categorias.filter_by(status_recebimento='RECEBIDO').count()
-        
-        lista_clientes.append({
-            "id": cliente.id,
-            "nome": cliente.nome,
-            "grupo": cliente.grupo,
-            "segmento": cliente.segmento,
+    """
+    Lista os clientes com o total de categorias e as concluídas em UMA consulta
+    agregada (LEFT JOIN categorias + GROUP BY cliente).
+
+    Parâmetros opcionais (query string):
+      grupo, segmento  -> filtros exatos
+      situacao         -> 'concluido' ou 'pendente'
+      ordenar          -> um de CAMPOS_ORDENACAO_CLIENTES (padrão 'nome')
+      direcao          -> 'asc' (padrão) ou 'desc'
+      limite, cursor   -> paginação por chave; o próximo cursor volta no
+                          cabeçalho X-Proximo-Cursor
+    Sem 'limite' a lista completa é retornada, como antes.
+    Responde 304 se o If-None-Match trouxer o ETag da versão atual, sem montar
+    a lista; o 304 pode vir sem X-Proximo-Cursor (vale o da resposta guardada).
+    """
+    ordenar = request.args.get("ordenar", "nome")
+    direcao = request.args.get("direcao", "asc")
+    situacao = request.args.get("situacao")
+
+    if ordenar not in CAMPOS_ORDENACAO_CLIENTES:
+        return jsonify({"erro": "Campo de ordenação inválido."}), 400
+    if direcao not in ("asc", "desc"):
+        return jsonify({"erro": "Direção de ordenação inválida."}), 400
+    if situacao not in (None, "concluido", "pendente"):
+        return jsonify({"erro": "Situação inválida."}), 400
+
+    limite = None
+    if "limite" in request.args:
+        try:
+            limite = int(request.args["limite"])
+        except ValueError:
+            limite = 0 # Não numérico: cai na mesma mensagem de erro
+        if not 1 <= limite <= LIMITE_MAXIMO_CLIENTES:
+            return jsonify({"erro": f"Limite deve estar entre 1 e {LIMITE_MAXIMO_CLIENTES}."}), 400
+
+    posicao = None
+    if request.args.get("cursor"):
+        posicao = _decodificar_cursor(request.args["cursor"], ordenar, direcao)
+        if posicao is None:
+            return jsonify({"erro": "Cursor inválido."}), 400
+
+    # Versão da lista: muda quando qualquer cliente é alterado (Cliente.versao),
+    # incluído ou removido. Com ela o ETag é calculado sem ler as categorias.
+    # Lida no primário; a réplica só monta a resposta se já estiver nela.
+    def versao_lista(sessao):
+        quantidade, soma_versoes = sessao.query(
+            func.count(Cliente.id), func.coalesce(func.sum(Cliente.versao), 0)
+        ).one()
+        return int(quantidade), int(soma_versoes) # SUM pode vir como Decimal no PostgreSQL
+
+    quantidade, soma_versoes = versao_lista(db.session)
+
+    def gerar():
+        leitura = sessao_leitura(db, (quantidade, soma_versoes), versao_lista)
+        total_categorias = func.count(Categoria.id)
+        concluidas = func.coalesce(
+            func.sum(case((Categoria.status_recebimento == 'RECEBIDO', 1), else_=0)), 0
+        )
+
+        consulta = (
+            leitura.query(
+                Cliente.id,
+                Cliente.nome,
+                Cliente.grupo,
+                Cliente.segmento,
+                total_categorias.label("total_categorias"),
+                concluidas.label("concluidas"),
+            )
+            .outerjoin(Categoria, Categoria.cliente_id == Cliente.id)
+            .group_by(Cliente.id, Cliente.nome, Cliente.grupo, Cliente.segmento)
+        )
+
+        # Filtros simples (WHERE)
+        if request.args.get("grupo"):
+            consulta = consulta.filter(Cliente.grupo == request.args["grupo"])
+        if request.args.get("segmento"):
+            consulta = consulta.filter(Cliente.segmento == request.args["segmento"])
+
+        # Filtro de conclusão (HAVING, depende dos agregados)
+        if situacao == "concluido":
+            consulta = consulta.having(and_(total_categorias > 0, concluidas == total_categorias))
+        elif situacao == "pendente":
+            consulta = consulta.having(or_(total_categorias == 0, concluidas < total_categorias))
+
+        colunas = {
+            "id": Cliente.id,
+            "nome": Cliente.nome,
+            "grupo": Cliente.grupo,
+            "segmento": Cliente.segmento,
             "total_categorias": total_categorias,
-            "concluidas": concluidas
-        })
-        
-    return jsonify(lista_clientes)
+            "concluidas": concluidas,
+        }
+        coluna = colunas[ordenar]
+        agregada = ordenar in ("total_categorias", "concluidas")
+
+        # Paginação por chave: continua a partir de (valor, id) do último item da página anterior
+        if posicao:
+            valor, ultimo_id = posicao
+            if direcao == "asc":
+                condicao = or_(coluna > valor, and_(coluna == valor, Cliente.id > ultimo_id))
+            else:
+                condicao = or_(coluna < valor, and_(coluna == valor, Cliente.id < ultimo_id))
+            consulta = consulta.having(condicao) if agregada else consulta.filter(condicao)
+
+        if direcao == "asc":
+            consulta = consulta.order_by(coluna.asc(), Cliente.id.asc())
+        else:
+            consulta = consulta.order_by(coluna.desc(), Cliente.id.desc())
+
+        if limite is not None:
+            # Busca um item a mais para saber se existe próxima página
+            consulta = consulta.limit(limite + 1)
+
+        linhas = consulta.all()
+
+        proximo_cursor = None
+        if limite is not None and len(linhas) > limite:
+            linhas = linhas[:limite]
+            valor = getattr(linhas[-1], ordenar)
+            if agregada:
+                valor = int(valor) # SUM pode vir como Decimal no PostgreSQL
+            proximo_cursor = _codificar_cursor(ordenar, direcao, valor, linhas[-1].id)
+
+        lista_clientes = [
+            {
+                "id": linha.id,
+                "nome": linha.nome,
+                "grupo": linha.grupo,
+                "segmento": linha.segmento,
+                "total_categorias": linha.total_categorias,
+                "concluidas": int(linha.concluidas),
+            }
+            for linha in linhas
+        ]
+
+        cabecalhos = {"X-Proximo-Cursor": proximo_cursor} if proximo_cursor else {}
+        return lista_clientes, cabecalhos
+
+    return cache_respostas.responder(
+        ("clientes", request.query_string),
+        f"clientes-{quantidade}-{soma_versoes}",
+        gerar,
+    )
 
 
 # ROTA 2: DETALHES DAS CATEGORIAS DO CLIENTE (Lendo do Banco de Dados)
+# status_bucket dos documentos quando o armazenamento não pôde ser consultado
+BUCKET_INDISPONIVEL = "Indisponível"
+
 @app.route("/api/clientes/<int:cliente_id>/categorias", methods=["GET"])
 @jwt_required()
 def detalhes_cliente(cliente_id):
-    cliente = Cliente.query.get(cliente_id)
+    # Versão lida no primário (ver sessao_leitura): o ETag nunca fica atrás de uma gravação
+    cliente = db.session.query(Cliente.nome, Cliente.versao).filter_by(id=cliente_id).first()
 
     if not cliente:
         return jsonify({"erro": "Cliente não encontrado"}), 404
 
-    lista_categorias = []
-    # Busca categorias relacionadas ao cliente e ordena
-    for categoria in cliente.categorias.order_by(Categoria.nome_categoria).all():
-        documentos = categoria.detalhes_documentos # Chama o getter que retorna o objeto Python
-        
-        # AQUI É ONDE O 'STATUS_BUCKET' É INJETADO (Simulação de auditoria)
-        # O modelo inicial não tem status_bucket, então vamos simular que todos são 'Não' por padrão
-        documentos_com_status = []
-        for doc_nome in documentos:
-             # Nesta fase, apenas a lista de nomes de documentos é salva
-             # A lógica real para verificar o bucket e definir 'Sim' ou 'Não'
-             # não está implementada, então simulamos que todos são 'Sim' se a lista existir.
-             status_simulacao = 'Sim' 
-             documentos_com_status.append({
-                 "nome_documento": doc_nome,
-                 "status_bucket": status_simulacao
-             })
-        # FIM DA SIMULAÇÃO
-
-        lista_categorias.append({
-            "nome_categoria": categoria.nome_categoria,
-            "status_recebimento": categoria.status_recebimento,
-            "total_documentos": len(documentos_com_status),
-            "documentos_encontrados": sum(1 for doc in documentos_com_status if doc['status_bucket'] == 'Sim'),
-            "detalhes_documentos": documentos_com_status 
-        })
-        
-    return jsonify({
-        "cliente_nome": cliente.nome,
-        "categorias": lista_categorias
-    })
+    prefixo = prefixo_cliente(cliente.nome)
+
+    # ETag: versão do cliente (escritas nas categorias) + versão da listagem do bucket
+    versao_bucket = None
+    if verificador_bucket:
+        try:
+            versao_bucket = verificador_bucket.versao(prefixo)
+        except Exception as e:
+            print(f"Erro ao listar o bucket do cliente {cliente_id}: {e}")
+    bucket_disponivel = versao_bucket is not None
+
+    def gerar():
+        leitura = sessao_leitura(
+            db, cliente.versao, lambda sessao: sessao.query(Cliente.versao).filter_by(id=cliente_id).scalar()
+        )
+
+        # 1. Categorias com as contagens de documentos calculadas pelo banco
+        categorias = (
+            leitura.query(
+                Categoria.id,
+                Categoria.nome_categoria,
+                Categoria.status_recebimento,
+                func.count(Documento.id).label("total_documentos"),
+            )
+            .outerjoin(Documento, Documento.categoria_id == Categoria.id)
+            .filter(Categoria.cliente_id == cliente_id)
+            .group_by(Categoria.id, Categoria.nome_categoria, Categoria.status_recebimento)
+            .order_by(Categoria.nome_categoria)
+            .all()
+        )
+
+        # 2. Todos os documentos do cliente em uma única consulta, agrupados por categoria
+        documentos_por_categoria = {}
+        documentos = (
+            leitura.query(Documento.categoria_id, Documento.nome)
+            .join(Categoria, Categoria.id == Documento.categoria_id)
+            .filter(Categoria.cliente_id == cliente_id)
+            .order_by(Documento.categoria_id, Documento.id)
+        )
+
+        for categoria_id, doc_nome in documentos:
+            documentos_por_categoria.setdefault(categoria_id, []).append({
+                "nome_documento": doc_nome,
+                "status_bucket": BUCKET_INDISPONIVEL
+            })
+
+        # 3. Verificação no bucket: todos os documentos do cliente são resolvidos
+        #    juntos (um arquivo enviado atende no máximo um documento). A listagem
+        #    e o resultado vêm do cache (sem chamadas ao armazenamento em um acerto).
+        #    Sem o armazenamento, nada é dado como encontrado.
+        todos = [doc for categoria in categorias for doc in documentos_por_categoria.get(categoria.id, [])]
+        if bucket_disponivel and todos:
+            try:
+                arquivos = verificador_bucket.verificar_documentos(
+                    prefixo, cliente_id, [doc["nome_documento"] for doc in todos]
+                )
+                for doc, arquivo in zip(todos, arquivos):
+                    doc["status_bucket"] = 'Sim' if arquivo else 'Não'
+            except Exception as e:
+                print(f"Erro ao verificar o bucket do cliente {cliente_id}: {e}")
+                for doc in todos:
+                    doc["status_bucket"] = BUCKET_INDISPONIVEL
+
+        lista_categorias = []
+        for categoria in categorias:
+            detalhes = documentos_por_categoria.get(categoria.id, [])
+            lista_categorias.append({
+                "nome_categoria": categoria.nome_categoria,
+                "status_recebimento": categoria.status_recebimento,
+                "total_documentos": categoria.total_documentos,
+                "documentos_encontrados": sum(1 for doc in detalhes if doc["status_bucket"] == 'Sim'),
+                "detalhes_documentos": detalhes
+            })
+
+        return {
+            "cliente_nome": cliente.nome,
+            "bucket_disponivel": bucket_disponivel,
+            "categorias": lista_categorias
+        }, None
+
+    return cache_respostas.responder(
+        ("cliente", cliente_id),
+        f"cliente-{cliente_id}-{cliente.versao}-{versao_bucket or 'indisponivel'}",
+        gerar,
+    )
+
+
+def _incrementar_versao(cliente_id):
+    """Gera uma nova versão (novo ETag) do cliente. Roda na mesma transação da escrita."""
+    db.session.execute(update(Cliente).where(Cliente.id == cliente_id).values(versao=Cliente.versao + 1))
+
+
+def _invalidar_respostas(cliente_id):
+    """Descarta as respostas renderizadas afetadas por uma escrita no cliente."""
+    cache_respostas.invalidar("cliente", cliente_id)
+    cache_respostas.invalidar("clientes")
 
 
 # ROTA 3: CONFIRMAR RECEBIMENTO (Escrevendo no Banco de Dados)
@@ -201,9 +499,12 @@ def confirmar_recebimento():
 
         # 2. Atualiza o status
         categoria.status_recebimento = status
+        id_cliente = categoria.cliente_id # Lido antes do commit, que expira o objeto
+        _incrementar_versao(id_cliente)
         
         # 3. Salva a mudança no banco de dados
         db.session.commit()
+        _invalidar_respostas(id_cliente)
         
         return jsonify({"mensagem": f"Status de '{nome_categoria}' atualizado para {status}."})
         
@@ -214,5 +515,130 @@ def confirmar_recebimento():
         return jsonify({"erro": "Erro interno ao salvar no banco de dados."}), 500
 
 
+# ROTA 4: ATUALIZAR STATUS EM LOTE (Uma transação, um UPDATE)
+@app.route("/api/clientes/<int:cliente_id>/categorias/status", methods=["POST"])
+@jwt_required()
+def atualizar_status_em_lote(cliente_id):
+    """
+    Atualiza o status de várias categorias do cliente de uma só vez.
+
+    Corpo: {"status": "RECEBIDO" | "PENDENTE", "categorias": [nomes...] | "todas"}
+    Retorna o resultado por categoria e as novas contagens agregadas.
+    """
+    data = request.get_json(silent=True) or {}
+    status = data.get("status")
+    nomes = data.get("categorias")
+
+    if status not in ['RECEBIDO', 'PENDENTE']:
+        return jsonify({"erro": "Status inválido."}), 400
+
+    todas = nomes == "todas"
+    if not todas and (not isinstance(nomes, list) or not nomes
+                      or not all(isinstance(nome, str) for nome in nomes)):
+        return jsonify({"erro": "Informe uma lista de categorias ou \"todas\"."}), 400
+
+    if not db.session.query(Cliente.id).filter_by(id=cliente_id).first():
+        return jsonify({"erro": "Cliente não encontrado"}), 404
+
+    filtro = [Categoria.cliente_id == cliente_id]
+    if not todas:
+        nomes = list(dict.fromkeys(nomes)) # Remove duplicados mantendo a ordem
+        filtro.append(Categoria.nome_categoria.in_(nomes))
+
+    try:
+        # 1. Estado atual das categorias afetadas (uma consulta)
+        status_atual = dict(
+            db.session.query(Categoria.nome_categoria, Categoria.status_recebimento).filter(*filtro).all()
+        )
+
+        # 2. UPDATE único; linhas que já estão no status pedido não são tocadas
+        alteradas = db.session.execute(
+            update(Categoria)
+            .where(*filtro, Categoria.status_recebimento != status)
+            .values(status_recebimento=status, data_atualizacao=datetime.utcnow())
+        ).rowcount
+        if alteradas:
+            _incrementar_versao(cliente_id)
+
+        # 3. Novas contagens agregadas do cliente
+        total_categorias, concluidas = db.session.query(
+            func.count(Categoria.id),
+            func.coalesce(func.sum(case((Categoria.status_recebimento == 'RECEBIDO', 1), else_=0)), 0),
+        ).filter(Categoria.cliente_id == cliente_id).one()
+
+        db.session.commit()
+        if alteradas:
+            _invalidar_respostas(cliente_id)
+
+    except Exception as e:
+        db.session.rollback()
+        print(f"Erro ao atualizar status em lote: {e}")
+        return jsonify({"erro": "Erro interno ao salvar no banco de dados."}), 500
+
+    resultados = []
+    for nome in (sorted(status_atual) if todas else nomes):
+        if nome not in status_atual:
+            resultado = "nao_encontrada"
+        elif status_atual[nome] == status:
+            resultado = "inalterada"
+        else:
+            resultado = "atualizada"
+        resultados.append({"nome_categoria": nome, "resultado": resultado})
+
+    return jsonify({
+        "status": status,
+        "atualizadas": sum(1 for item in resultados if item["resultado"] == "atualizada"),
+        "resultados": resultados,
+        "total_categorias": total_categorias,
+        "concluidas": int(concluidas),
+    })
+
+
+# ROTA 5: NOTIFICAÇÕES DE ALTERAÇÃO NO BUCKET (Atualização incremental do cache)
+@app.route("/api/bucket/notificacoes", methods=["POST"])
+@jwt_required()
+def notificar_bucket():
+    """
+    Recebe eventos de arquivos criados/removidos e os aplica no cache de listagens,
+    sem relistar o prefixo. Os eventos não são conferidos no armazenamento: o
+    prefixo é relistado quando o TTL do cache expira (ver CacheListagem.notificar).
+
+    Corpo: {"eventos": [{"tipo": "criado" | "removido", "objeto": "arquivos_clientes/<cliente>/<arquivo>"}]}
+    """
+    data = request.get_json(silent=True) or {}
+    eventos = data.get("eventos")
+
+    if not isinstance(eventos, list):
+        return jsonify({"erro": "Informe a lista de eventos."}), 400
+    if not verificador_bucket:
+        return jsonify({"erro": "Armazenamento do bucket indisponível."}), 503
+
+    alteracoes = {} # prefixo -> (adicionados, removidos)
+    for evento in eventos:
+        tipo = evento.get("tipo") if isinstance(evento, dict) else None
+        objeto = evento.get("objeto") if isinstance(evento, dict) else None
+        if tipo not in ("criado", "removido") or not isinstance(objeto, str) or objeto.count("/") < 2:
+            return jsonify({"erro": "Evento inválido."}), 400
+
+        raiz, cliente, arquivo = objeto.split("/", 2)
+        adicionados, removidos = alteracoes.setdefault(f"{raiz}/{cliente}", ([], []))
+        (adicionados if tipo == "criado" else removidos).append(arquivo)
+
+    aplicados = sum(
+        1 for prefixo, (adicionados, removidos) in alteracoes.items()
+        if verificador_bucket.notificar(prefixo, adicionados, removidos)
+    )
+    return jsonify({"prefixos": len(alteracoes), "prefixos_em_cache": aplicados})
+
+
+# ROTA 6: ESTATÍSTICAS DO CACHE DO BUCKET
+@app.route("/api/bucket/cache", methods=["GET"])
+@jwt_required()
+def estatisticas_cache_bucket():
+    if not verificador_bucket:
+        return jsonify({"erro": "Armazenamento do bucket indisponível."}), 503
+    return jsonify(verificador_bucket.estatisticas())
+
+
 if __name__ == "__main__":
     app.run(debug=True)
\ No newline at end of file
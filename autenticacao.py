@@ -0,0 +1,209 @@
+# autenticacao.py
+"""
+Autenticação sob carga.
+
+- Política de hash configurável (passlib CryptContext). Hashes fora da política
+  atual (outro esquema ou outra quantidade de rounds) são refeitos no login.
+- A verificação da senha roda num pool pequeno e limitado de threads. No
+  máximo max_pendentes logins (abaixo das threads do waitress) esperam por
+  ela; além disso o login responde 503 em vez de enfileirar.
+- Limite de falhas de login por usuário+IP e por IP (janela deslizante).
+- Cache curto das claims de tokens JWT já verificados, por hash do token:
+  requisições repetidas com o mesmo token não refazem a verificação da assinatura.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+
+from flask_jwt_extended import JWTManager
+from passlib.context import CryptContext
+
+
+class LoginSobrecarregado(Exception):
+    """O pool de verificação de senhas está cheio."""
+
+
+# ---------------------------------------------
+# POLÍTICA DE HASH E VERIFICAÇÃO DE SENHAS
+# ---------------------------------------------
+
+def criar_contexto_senhas(esquema="pbkdf2_sha256", rounds=29000):
+    """
+    CryptContext com um esquema e uma quantidade de rounds fixos. Hashes antigos
+    (inclusive com mais ou menos rounds) continuam válidos e são marcados para atualização.
+    """
+    esquemas = [esquema] if esquema == "pbkdf2_sha256" else [esquema, "pbkdf2_sha256"]
+    opcoes = {}
+    if rounds:
+        opcoes = {
+            f"{esquema}__rounds": rounds,
+            f"{esquema}__min_rounds": rounds,
+            f"{esquema}__max_rounds": rounds,
+        }
+    return CryptContext(schemes=esquemas, default=esquema, deprecated="auto", **opcoes)
+
+
+class VerificadorSenhas:
+    """Executa verify_and_update num pool limitado, fora das threads de requisição."""
+
+    def __init__(self, contexto, max_threads=2, max_pendentes=4, timeout=10):
+        self.contexto = contexto
+        self.timeout = timeout
+        self._pool = ThreadPoolExecutor(max_workers=max_threads, thread_name_prefix="login")
+        self._vagas = threading.BoundedSemaphore(max_pendentes)
+        self._hash_ficticio = None
+
+    def hash_ficticio(self):
+        """Hash usado quando o usuário não existe, para o tempo de resposta não denunciá-lo."""
+        if self._hash_ficticio is None:
+            self._hash_ficticio = self.contexto.hash("usuario-inexistente")
+        return self._hash_ficticio
+
+    def verificar(self, senha, hash_senha):
+        """
+        Retorna (senha_ok, novo_hash_ou_None). Levanta LoginSobrecarregado se o pool estiver cheio.
+
+        A thread da requisição espera o resultado; por isso max_pendentes deve ficar
+        abaixo do número de threads do servidor. A vaga só é devolvida quando a
+        verificação termina (ou é cancelada), não quando a requisição desiste dela.
+        """
+        if not self._vagas.acquire(blocking=False):
+            raise LoginSobrecarregado()
+        try:
+            futuro = self._pool.submit(self.contexto.verify_and_update, senha, hash_senha)
+        except BaseException:
+            self._vagas.release()
+            raise
+        futuro.add_done_callback(lambda _futuro: self._vagas.release())
+
+        try:
+            return futuro.result(timeout=self.timeout)
+        except FuturesTimeoutError:
+            futuro.cancel() # Se ainda estiver na fila, não chega a rodar
+            raise LoginSobrecarregado()
+
+
+# ---------------------------------------------
+# LIMITE DE TENTATIVAS
+# ---------------------------------------------
+
+class LimitadorTentativas:
+    """Conta falhas por chave (usuário, IP) numa janela deslizante de 'janela' segundos."""
+
+    def __init__(self, max_falhas=10, janela=300, max_chaves=100000, relogio=time.monotonic):
+        self.max_falhas = max_falhas
+        self.janela = janela
+        self.max_chaves = max_chaves
+        self._relogio = relogio
+        self._falhas = OrderedDict() # chave -> deque de instantes
+        self._trava = threading.Lock()
+
+    def _recentes(self, chave, agora):
+        falhas = self._falhas.get(chave)
+        if falhas is None:
+            return None
+        while falhas and falhas[0] <= agora - self.janela:
+            falhas.popleft()
+        if not falhas:
+            del self._falhas[chave]
+            return None
+        return falhas
+
+    def permitido(self, *chaves):
+        agora = self._relogio()
+        with self._trava:
+            for chave in chaves:
+                falhas = self._recentes(chave, agora)
+                if falhas is not None and len(falhas) >= self.max_falhas:
+                    return False
+        return True
+
+    def registrar_falha(self, *chaves):
+        agora = self._relogio()
+        with self._trava:
+            for chave in chaves:
+                falhas = self._recentes(chave, agora)
+                if falhas is None:
+                    falhas = self._falhas[chave] = deque()
+                falhas.append(agora)
+                self._falhas.move_to_end(chave)
+            while len(self._falhas) > self.max_chaves:
+                self._falhas.popitem(last=False)
+
+    def limpar(self, *chaves):
+        with self._trava:
+            for chave in chaves:
+                self._falhas.pop(chave, None)
+
+
+# ---------------------------------------------
+# CACHE DE TOKENS JWT
+# ---------------------------------------------
+
+class CacheTokens:
+    """LRU de claims já verificadas, por SHA-256 do token, com validade curta."""
+
+    def __init__(self, ttl=60, max_tokens=10000, relogio=time.time):
+        self.ttl = ttl
+        self.max_tokens = max_tokens
+        self._relogio = relogio
+        self._tokens = OrderedDict() # hash -> (expira_em, claims)
+        self._trava = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+
+    @staticmethod
+    def _chave(token):
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def obter(self, token):
+        chave = self._chave(token)
+        agora = self._relogio()
+        with self._trava:
+            item = self._tokens.get(chave)
+            if item is not None and item[0] > agora:
+                self._tokens.move_to_end(chave)
+                self.acertos += 1
+                return dict(item[1])
+            if item is not None:
+                del self._tokens[chave]
+            self.falhas += 1
+        return None
+
+    def guardar(self, token, claims):
+        agora = self._relogio()
+        expira_em = agora + self.ttl
+        if "exp" in claims:
+            # Nunca além da expiração do próprio token
+            expira_em = min(expira_em, claims["exp"])
+        if expira_em <= agora:
+            return
+        with self._trava:
+            self._tokens[self._chave(token)] = (expira_em, dict(claims))
+            self._tokens.move_to_end(self._chave(token))
+            while len(self._tokens) > self.max_tokens:
+                self._tokens.popitem(last=False)
+
+
+class JWTManagerComCache(JWTManager):
+    """
+    JWTManager que consulta o CacheTokens antes de decodificar e verificar o token.
+    Os demais callbacks do flask_jwt_extended (blocklist, user loader...) continuam rodando.
+    """
+
+    def __init__(self, app=None, cache_tokens=None, **kwargs):
+        self.cache_tokens = cache_tokens
+        super().__init__(app, **kwargs)
+
+    def _decode_jwt_from_config(self, encoded_token, csrf_value=None, allow_expired=False):
+        # Tokens com CSRF (cookies) ou aceitando expirados seguem o caminho normal
+        if self.cache_tokens is None or self.cache_tokens.ttl <= 0 or csrf_value is not None or allow_expired:
+            return super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+
+        claims = self.cache_tokens.obter(encoded_token)
+        if claims is None:
+            claims = super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+            self.cache_tokens.guardar(encoded_token, claims)
+        return claims
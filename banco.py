@@ -0,0 +1,115 @@
+# banco.py
+"""
+Configuração das conexões com o banco (engine e pool do SQLAlchemy).
+
+- O pool é dimensionado pelo número de threads do waitress: cada thread
+  segura no máximo uma conexão por requisição, então pool_size = threads
+  (+ um pequeno overflow para scripts e picos). Sem isso, o padrão do
+  SQLAlchemy (5 + 10) fica desalinhado com o servidor.
+- pool_pre_ping descarta conexões mortas (reinício do Postgres, timeout do
+  proxy) antes de usá-las; pool_recycle renova conexões antigas.
+- pool_timeout curto: com o pool esgotado, a requisição falha rápido em vez
+  de travar a thread do waitress.
+- statement_timeout no Postgres corta consultas descontroladas.
+- Modo pooler externo (PgBouncer, pooler do provedor): NullPool, cada
+  requisição abre/fecha a conexão no pooler, que faz o reaproveitamento.
+- Réplica de leitura opcional (DATABASE_URL_LEITURA): as rotas GET leem a
+  versão (ETag) no primário, que é barato, e montam a resposta na réplica só
+  se ela já estiver nessa versão; senão, no primário. Assim o atraso da
+  réplica nunca devolve o dado antigo logo depois de uma gravação.
+"""
+from flask import g
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+
+def _eh_sqlite_em_memoria(url):
+    return url.startswith("sqlite") and (":memory:" in url or url.rstrip("/") in ("sqlite:", "sqlite:/"))
+
+
+def opcoes_engine(url, threads=8, max_overflow=2, pool_timeout=10, pool_recycle=1800,
+                  statement_timeout_ms=15000, pooler_externo=False):
+    """Retorna o dicionário para SQLALCHEMY_ENGINE_OPTIONS (ou para uma entrada de SQLALCHEMY_BINDS)."""
+    if not url or _eh_sqlite_em_memoria(url):
+        return {}  # Pool próprio do SQLite em memória; não aceita pool_size
+
+    if pooler_externo:
+        opcoes = {"poolclass": NullPool} # Conexões novas a cada uso: pre-ping seria redundante
+    else:
+        opcoes = dict(
+            pool_pre_ping=True,
+            pool_size=threads,
+            max_overflow=max_overflow,
+            pool_timeout=pool_timeout,
+            pool_recycle=pool_recycle,
+        )
+
+    if url.startswith("postgres"):
+        argumentos = {"connect_timeout": pool_timeout, "application_name": "checklist"}
+        if statement_timeout_ms and not pooler_externo:
+            # Poolers em modo transação não repassam parâmetros de inicialização;
+            # nesse caso configure o timeout no próprio role (ALTER ROLE ... SET statement_timeout)
+            argumentos["options"] = f"-c statement_timeout={int(statement_timeout_ms)}"
+        opcoes["connect_args"] = argumentos
+    elif url.startswith("sqlite"):
+        # Espera pelo lock de escrita em vez de falhar com 'database is locked'
+        opcoes["connect_args"] = {"timeout": pool_timeout}
+
+    return opcoes
+
+
+def configurar_banco(app, ambiente):
+    """
+    Preenche as chaves SQLALCHEMY_* do app a partir das variáveis de ambiente.
+    Deve rodar antes de SQLAlchemy(app).
+    """
+    url = ambiente.get("DATABASE_URL")
+    url_leitura = ambiente.get("DATABASE_URL_LEITURA")
+
+    app.config["WAITRESS_THREADS"] = int(ambiente.get("WAITRESS_THREADS", 8))
+    app.config["DB_MAX_OVERFLOW"] = int(ambiente.get("DB_MAX_OVERFLOW", 2))
+    app.config["DB_POOL_TIMEOUT"] = int(ambiente.get("DB_POOL_TIMEOUT", 10)) # segundos
+    app.config["DB_POOL_RECYCLE"] = int(ambiente.get("DB_POOL_RECYCLE", 1800)) # segundos
+    app.config["DB_STATEMENT_TIMEOUT_MS"] = int(ambiente.get("DB_STATEMENT_TIMEOUT_MS", 15000))
+    app.config["DB_POOLER_EXTERNO"] = ambiente.get("DB_POOLER_EXTERNO", "").lower() in ("1", "true", "sim")
+
+    opcoes = dict(
+        threads=int(ambiente.get("DB_POOL_SIZE", app.config["WAITRESS_THREADS"])),
+        max_overflow=app.config["DB_MAX_OVERFLOW"],
+        pool_timeout=app.config["DB_POOL_TIMEOUT"],
+        pool_recycle=app.config["DB_POOL_RECYCLE"],
+        statement_timeout_ms=app.config["DB_STATEMENT_TIMEOUT_MS"],
+        pooler_externo=app.config["DB_POOLER_EXTERNO"],
+    )
+
+    app.config["SQLALCHEMY_DATABASE_URI"] = url
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = opcoes_engine(url, **opcoes)
+    if url_leitura:
+        app.config["SQLALCHEMY_BINDS"] = {"leitura": {"url": url_leitura, **opcoes_engine(url_leitura, **opcoes)}}
+
+
+def instalar_sessao_leitura(app):
+    """Fecha a sessão de leitura (se usada) ao fim de cada contexto do app."""
+
+    @app.teardown_appcontext
+    def _fechar_sessao_leitura(_erro):
+        sessao = g.pop("_sessao_leitura", None)
+        if sessao is not None:
+            sessao.close()
+
+
+def sessao_leitura(db, versao, ler_versao):
+    """
+    Sessão para as consultas somente leitura de uma resposta cuja versão, lida
+    no primário, é 'versao'. Usa a réplica (DATABASE_URL_LEITURA) se
+    ler_versao(sessao_da_replica) já devolve essa versão; senão, ou sem réplica,
+    a própria db.session.
+    """
+    engine = db.engines.get("leitura")
+    if engine is None:
+        return db.session
+    if "_sessao_leitura" not in g:
+        g._sessao_leitura = Session(bind=engine)
+    if ler_versao(g._sessao_leitura) != versao:
+        return db.session # Réplica atrasada
+    return g._sessao_leitura
@@ -0,0 +1,78 @@
+"""
+Banco SQLite temporário e carga de dados sintéticos para os scripts de benchmarks/.
+
+usar_banco_temporario() precisa rodar ANTES de importar o app: o app lê
+DATABASE_URL ao ser importado.
+
+    from banco_temporario import popular, usar_banco_temporario
+    usar_banco_temporario("bench_clientes_")
+    from app import app  # noqa: E402
+"""
+import os
+import sys
+import tempfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LOTE = 10000
+
+
+def usar_banco_temporario(prefixo):
+    """Aponta o app para um SQLite novo num diretório temporário. Retorna o caminho do arquivo."""
+    if RAIZ not in sys.path:
+        sys.path.insert(0, RAIZ)
+    os.chdir(RAIZ)
+
+    arquivo_db = os.path.join(tempfile.mkdtemp(prefix=prefixo), "bench.db")
+    # Sempre o banco temporário, mesmo com DATABASE_URL já definido no ambiente
+    # (ex.: shell do Render): os scripts apagam e inserem dados com ids 1..N
+    os.environ["DATABASE_URL"] = f"sqlite:///{arquivo_db}"
+    os.environ.pop("DATABASE_URL_LEITURA", None)
+    return arquivo_db
+
+
+def _inserir(db, tabela, linhas):
+    """Executa o INSERT em lotes de LOTE linhas (executemany), sem ORM por linha."""
+    lote = []
+    for linha in linhas:
+        lote.append(linha)
+        if len(lote) >= LOTE:
+            db.session.execute(tabela.insert(), lote)
+            lote = []
+    if lote:
+        db.session.execute(tabela.insert(), lote)
+
+
+def popular(qtd_clientes, categorias_por_cliente, documentos_por_categoria=0):
+    """
+    Substitui os dados do banco por 'qtd_clientes' clientes (ids 1..N), cada um com
+    'categorias_por_cliente' categorias ('CATEGORIA 00'...; 1 em cada 3 RECEBIDO)
+    e 'documentos_por_categoria' documentos por categoria.
+    """
+    from app import app, db
+    from models import Categoria, Cliente, Documento
+
+    with app.app_context():
+        db.create_all()
+        db.session.query(Documento).delete()
+        db.session.query(Categoria).delete()
+        db.session.query(Cliente).delete()
+
+        _inserir(db, Cliente.__table__, (
+            {"id": i, "nome": f"CLIENTE {i:05d}", "grupo": f"GRUPO {i % 50}",
+             "segmento": ("Varejo", "Indústria", "Serviços")[i % 3]}
+            for i in range(1, qtd_clientes + 1)
+        ))
+        _inserir(db, Categoria.__table__, (
+            {"cliente_id": c, "nome_categoria": f"CATEGORIA {n:02d}",
+             "status_recebimento": "RECEBIDO" if (c + n) % 3 == 0 else "PENDENTE",
+             "detalhes_documentos_json": "[]"}
+            for c in range(1, qtd_clientes + 1) for n in range(categorias_por_cliente)
+        ))
+        if documentos_por_categoria:
+            categorias = [id_ for (id_,) in db.session.query(Categoria.id)]
+            _inserir(db, Documento.__table__, (
+                {"categoria_id": categoria_id, "nome": f"DOCUMENTO {n:02d}.pdf"}
+                for categoria_id in categorias for n in range(documentos_por_categoria)
+            ))
+        db.session.commit()
@@ -0,0 +1,96 @@
+"""
+Benchmark de carga da autenticação.
+
+Mede, com várias threads simultâneas (como as do waitress):
+  - vazão do POST /login (verificação de senha no pool limitado);
+  - vazão de um GET autenticado com e sem o cache de tokens JWT.
+
+A vazão conta só as respostas 200; as recusas (503 do pool de login cheio,
+429...) aparecem à parte, como taxa de rejeição. Por padrão o login usa
+LOGIN_MAX_PENDENTES threads, para medir o hash das senhas e não a rapidez dos 503.
+
+Uso (a partir da raiz do projeto):
+    python benchmarks/bench_autenticacao.py [--threads 8] [--threads-login N] [--segundos 3]
+"""
+import argparse
+import threading
+import time
+from collections import Counter
+
+from banco_temporario import usar_banco_temporario
+
+usar_banco_temporario("bench_autenticacao_")
+
+from app import app, jwt  # noqa: E402
+from gerenciar_usuarios import criar  # noqa: E402
+
+USUARIO, SENHA = "benchmark", "senha-do-benchmark"
+
+
+def carga(threads, segundos, requisicao):
+    """Dispara 'requisicao(cliente_http)' em paralelo e retorna (respostas 200/s, contagem por status)."""
+    status = Counter()
+    trava = threading.Lock()
+    fim = time.perf_counter() + segundos
+
+    def trabalhador():
+        cliente_http = app.test_client()
+        locais = Counter()
+        while time.perf_counter() < fim:
+            locais[requisicao(cliente_http)] += 1
+        with trava:
+            status.update(locais)
+
+    grupo = [threading.Thread(target=trabalhador) for _ in range(threads)]
+    inicio = time.perf_counter()
+    for t in grupo:
+        t.start()
+    for t in grupo:
+        t.join()
+    decorrido = time.perf_counter() - inicio
+    return status[200] / decorrido, status
+
+
+def _relatorio(descricao, vazao, status):
+    rejeitadas = sum(total for codigo, total in status.items() if codigo != 200)
+    taxa = rejeitadas / max(1, sum(status.values()))
+    print(f"{descricao:<34}{vazao:8.1f} ok/s  rejeição {taxa:6.1%}  {dict(status)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--threads-login", type=int, default=app.config["LOGIN_MAX_PENDENTES"],
+                        help="Threads no POST /login (padrão: LOGIN_MAX_PENDENTES)")
+    parser.add_argument("--segundos", type=float, default=3)
+    args = parser.parse_args()
+
+    criar(USUARIO, SENHA)
+
+    def login(cliente_http):
+        return cliente_http.post("/login", json={"username": USUARIO, "password": SENHA}).status_code
+
+    _relatorio(f"POST /login ({args.threads_login} threads)", *carga(args.threads_login, args.segundos, login))
+
+    token = app.test_client().post("/login", json={"username": USUARIO, "password": SENHA}).get_json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    def get_autenticado(cliente_http):
+        return cliente_http.get("/api/bucket/cache", headers=headers).status_code
+
+    cache_tokens = jwt.cache_tokens
+    ttl_original = cache_tokens.ttl
+
+    cache_tokens.ttl = 0
+    sem_cache, status = carga(args.threads, args.segundos, get_autenticado)
+    _relatorio("GET autenticado (sem cache JWT)", sem_cache, status)
+
+    cache_tokens.ttl = ttl_original or 60
+    com_cache, status = carga(args.threads, args.segundos, get_autenticado)
+    _relatorio("GET autenticado (com cache JWT)", com_cache, status)
+    print(f">>> Cache de tokens: {cache_tokens.acertos} acertos, {cache_tokens.falhas} falhas "
+          f"({com_cache / sem_cache:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
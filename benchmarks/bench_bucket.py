@@ -0,0 +1,91 @@
+"""
+Benchmark do índice de arquivos do bucket (bucket.py).
+
+Gera prefixos sintéticos com 1 mil e 100 mil arquivos, monta o índice e mede o
+tempo de montagem e o custo por busca. O custo por busca deve ficar
+praticamente constante entre os dois tamanhos (não pode ser O(arquivos)).
+
+Uso (a partir da raiz do projeto):
+    python benchmarks/bench_bucket.py [--arquivos 100000] [--buscas 20000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bucket import IndiceArquivos  # noqa: E402
+
+MODELOS = (
+    "{mes:02d}.{ano}_ExtratoBB_Loja {loja}.pdf",
+    "{conta:05d}-{dv}.xls",
+    "{mes:02d}.{ano}_Extrato_Bradesco_{conta}-{dv}.PDF",
+    "RELATORIO_CAIXA_{loja:02d}_{mes:02d}.{ano}.xlsx",
+    "FOLHA {mes:02d}-{ano} LOJA {loja}.pdf",
+)
+
+
+def gerar_arquivos(quantidade, semente=42):
+    aleatorio = random.Random(semente)
+    arquivos = set()
+    while len(arquivos) < quantidade:
+        arquivos.add(aleatorio.choice(MODELOS).format(
+            mes=aleatorio.randint(1, 12),
+            ano=aleatorio.randint(2015, 2025),
+            loja=aleatorio.randint(1, 500),
+            conta=aleatorio.randint(1, 99999),
+            dv=aleatorio.randint(0, 9),
+        ))
+    return sorted(arquivos)
+
+
+def variar(nome, aleatorio):
+    """Simula o nome 'cobrado': caixa diferente, sufixo extra ou espaço extra."""
+    base, _, extensao = nome.rpartition(".")
+    escolha = aleatorio.randint(0, 3)
+    if escolha == 0:
+        return nome.upper()
+    if escolha == 1:
+        return f"{base}_AplicAut.{extensao}"
+    if escolha == 2:
+        return nome.replace("_", "_ ", 1)
+    return f"INEXISTENTE_{aleatorio.randint(1, 10**9)}.pdf"
+
+
+def medir(quantidade, qtd_buscas):
+    arquivos = gerar_arquivos(quantidade)
+
+    inicio = time.perf_counter()
+    indice = IndiceArquivos(arquivos)
+    montagem = time.perf_counter() - inicio
+
+    aleatorio = random.Random(7)
+    esperados = [variar(aleatorio.choice(arquivos), aleatorio) for _ in range(qtd_buscas)]
+
+    inicio = time.perf_counter()
+    encontrados = sum(1 for nome in esperados if indice.buscar(nome))
+    busca = (time.perf_counter() - inicio) / qtd_buscas
+
+    print(f"{quantidade:>8} arquivos | montagem {montagem * 1000:9.1f} ms | "
+          f"{busca * 1e6:6.2f} µs/busca | {encontrados}/{qtd_buscas} encontrados")
+    return busca
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--arquivos", type=int, default=100000)
+    parser.add_argument("--buscas", type=int, default=20000)
+    args = parser.parse_args()
+
+    pequeno = medir(1000, args.buscas)
+    grande = medir(args.arquivos, args.buscas)
+
+    razao = grande / pequeno
+    assert razao < 5, f"Busca cresceu {razao:.1f}x com o número de arquivos"
+    print(f">>> OK: custo por busca variou {razao:.2f}x entre 1 mil e {args.arquivos} arquivos.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Verificação e benchmark do cache de listagens do bucket (cache_bucket.py).
+
+Usa um armazenamento falso, em memória, que conta as chamadas de listagem, e um
+relógio controlado para exercitar TTL, revalidação por geração, notificações
+incrementais e expulsão LRU/memória. No fim mede o custo de uma consulta com
+acerto no cache contra uma consulta que relista o prefixo.
+
+Uso (a partir da raiz do projeto):
+    python benchmarks/bench_cache_bucket.py [--arquivos 100000]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bucket import Armazenamento  # noqa: E402
+from cache_bucket import CacheListagem  # noqa: E402
+
+
+class ArmazenamentoFalso(Armazenamento):
+    """Prefixos em memória; conta listagens e expõe uma geração por prefixo."""
+
+    def __init__(self, dados, com_geracao=True):
+        self.dados = {prefixo: list(arquivos) for prefixo, arquivos in dados.items()}
+        self.geracoes = {prefixo: 1 for prefixo in dados}
+        self.com_geracao = com_geracao
+        self.listagens = 0
+
+    def listar(self, prefixo):
+        self.listagens += 1
+        return list(self.dados.get(prefixo, []))
+
+    def geracao(self, prefixo):
+        return self.geracoes.get(prefixo, 0) if self.com_geracao else None
+
+    def enviar(self, prefixo, arquivo):
+        self.dados.setdefault(prefixo, []).append(arquivo)
+        self.geracoes[prefixo] = self.geracoes.get(prefixo, 0) + 1
+
+
+class Relogio:
+    def __init__(self):
+        self.agora = 0.0
+
+    def __call__(self):
+        return self.agora
+
+
+def verificar_comportamento():
+    prefixo = "arquivos_clientes/mercado_violeta"
+    armazenamento = ArmazenamentoFalso({prefixo: ["09060-5.xls", "10.2025_ExtratoBB_Loja 2.pdf"]})
+    relogio = Relogio()
+    cache = CacheListagem(armazenamento, ttl=60, relogio=relogio)
+    esperados = ["09060-5_AplicAut.xls", "10.2025_ExtratoBB_ Loja 05.pdf"]
+
+    # 1. Primeira consulta lista; as seguintes são acertos, sem chamadas ao armazenamento
+    assert cache.verificar_documentos(prefixo, 1, esperados) == ["09060-5.xls", None]
+    for _ in range(100):
+        cache.verificar_documentos(prefixo, 1, esperados)
+    assert armazenamento.listagens == 1
+
+    # 1b. Um arquivo atende um documento só, e a correspondência exata escolhe primeiro
+    assert cache.verificar_documentos(prefixo, 2, esperados + ["09060-5.xls"]) == [None, None, "09060-5.xls"]
+    assert cache.verificar_documentos(prefixo, 3, ["09060-5.XLSX", "09060-5.pdf"]) == ["09060-5.xls", None]
+
+    # 2. TTL expirado com a mesma geração: só revalida, não relista
+    relogio.agora = 61
+    cache.verificar_documentos(prefixo, 1, esperados)
+    assert armazenamento.listagens == 1
+    assert cache.estatisticas()["revalidacoes"] == 1
+
+    # 3. Notificação: aplica o arquivo novo no índice sem relistar
+    armazenamento.enviar(prefixo, "10.2025_ExtratoBB_Loja 5.pdf")
+    cache.notificar(prefixo, adicionados=["10.2025_ExtratoBB_Loja 5.pdf"])
+    assert cache.verificar_documentos(prefixo, 1, esperados)[1] == "10.2025_ExtratoBB_Loja 5.pdf"
+    assert armazenamento.listagens == 1
+
+    # 3b. Depois de uma notificação o TTL relista, mesmo com a geração igual:
+    #     um arquivo notificado que não existe some do índice
+    cache.notificar(prefixo, adicionados=["FORJADO_01.pdf"])
+    assert "FORJADO_01.pdf" in cache.indice(prefixo).arquivos
+    relogio.agora = 130
+    assert "FORJADO_01.pdf" not in cache.indice(prefixo).arquivos
+    assert armazenamento.listagens == 2
+
+    # 4. Geração mudou sem notificação: relista quando o TTL expira
+    armazenamento.enviar(prefixo, "RELATORIO_EXTRA_05.pdf")
+    relogio.agora = 200
+    cache.indice(prefixo)
+    assert armazenamento.listagens == 3
+
+    # 5. Backend sem geração: relista a cada expiração do TTL
+    sem_geracao = ArmazenamentoFalso({prefixo: ["a_1.pdf"]}, com_geracao=False)
+    cache_sem_geracao = CacheListagem(sem_geracao, ttl=60, relogio=relogio)
+    cache_sem_geracao.indice(prefixo)
+    relogio.agora = 500
+    cache_sem_geracao.indice(prefixo)
+    assert sem_geracao.listagens == 2
+
+    # 6. LRU por quantidade de prefixos e por memória
+    muitos = ArmazenamentoFalso({f"arquivos_clientes/c{i}": [f"arq_{i}_{n}.pdf" for n in range(100)] for i in range(10)})
+    cache_lru = CacheListagem(muitos, ttl=60, max_prefixos=3, relogio=relogio)
+    for i in range(10):
+        cache_lru.indice(f"arquivos_clientes/c{i}")
+    cache_lru.indice("arquivos_clientes/c9")
+    estatisticas = cache_lru.estatisticas()
+    assert estatisticas["prefixos"] == 3 and estatisticas["expulsoes"] == 7 and muitos.listagens == 10
+
+    cache_memoria = CacheListagem(muitos, ttl=60, memoria_maxima=150 * 1024, relogio=relogio)
+    for i in range(10):
+        cache_memoria.indice(f"arquivos_clientes/c{i}")
+    assert cache_memoria.estatisticas()["memoria_estimada"] <= 150 * 1024
+
+    print(">>> OK: TTL, revalidação por geração, notificações e expulsão LRU/memória.")
+    print(f"    {cache.estatisticas()}")
+
+
+def medir(qtd_arquivos):
+    prefixo = "arquivos_clientes/grande"
+    arquivos = [f"{n % 12 + 1:02d}.2025_Extrato_{n:06d}-{n % 10}.pdf" for n in range(qtd_arquivos)]
+    armazenamento = ArmazenamentoFalso({prefixo: arquivos})
+    cache = CacheListagem(armazenamento, ttl=300)
+    esperados = [f"{n % 12 + 1:02d}.2025_Extrato_{n:06d}-{n % 10}_Aplic.pdf" for n in range(0, qtd_arquivos, qtd_arquivos // 40)]
+
+    inicio = time.perf_counter()
+    cache.verificar_documentos(prefixo, 1, esperados)
+    falha = time.perf_counter() - inicio
+
+    repeticoes = 1000
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        cache.verificar_documentos(prefixo, 1, esperados)
+    acerto = (time.perf_counter() - inicio) / repeticoes
+
+    assert armazenamento.listagens == 1
+    print(f"{qtd_arquivos} arquivos: falha (lista + indexa) {falha * 1000:.1f} ms | acerto {acerto * 1e6:.1f} µs | "
+          f"{armazenamento.listagens} listagem")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--arquivos", type=int, default=100000)
+    args = parser.parse_args()
+
+    verificar_comportamento()
+    medir(args.arquivos)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Teste de carga local da API com concorrência crescente.
+
+Sobe o app num servidor HTTP real (waitress, se instalado; senão o servidor
+WSGI da biblioteca padrão com uma thread por conexão), com um SQLite
+temporário no lugar do Postgres, e dispara GETs autenticados em
+/api/clientes e /api/clientes/<id>/categorias com 1, 2, 4... clientes
+simultâneos. Para cada nível, reporta vazão, latência p50/p99 e erros.
+
+Com --url, mede um servidor já rodando (ex.: o app apontando para um
+Postgres de homologação) em vez de subir um local; informe --token.
+
+Uso (a partir da raiz do projeto):
+    python benchmarks/bench_carga.py [--concorrencia 1,2,4,8,16,32] [--segundos 3] [--threads 8]
+    python benchmarks/bench_carga.py --url http://localhost:8080 --token <jwt>
+"""
+import argparse
+import http.client
+import os
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+from banco_temporario import popular, usar_banco_temporario
+
+
+def percentil(valores, fracao):
+    if not valores:
+        return 0.0
+    return valores[min(len(valores) - 1, int(fracao * (len(valores) - 1) + 0.5))]
+
+
+def subir_servidor(app, threads):
+    """Inicia o servidor numa porta livre e retorna (url, descrição)."""
+    try:
+        from waitress import create_server
+    except ImportError:
+        from socketserver import ThreadingMixIn
+        from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+        class ServidorComThreads(ThreadingMixIn, WSGIServer):
+            daemon_threads = True
+            request_queue_size = 128 # O padrão (5) derruba conexões sob concorrência
+
+        class SemLog(WSGIRequestHandler):
+            def log_message(self, *args):
+                pass
+
+        servidor = make_server("127.0.0.1", 0, app, server_class=ServidorComThreads, handler_class=SemLog)
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+        return f"http://127.0.0.1:{servidor.server_port}", "wsgiref (uma thread por conexão)"
+
+    servidor = create_server(app, host="127.0.0.1", port=0, threads=threads)
+    threading.Thread(target=servidor.run, daemon=True).start()
+    return f"http://127.0.0.1:{servidor.effective_port}", f"waitress ({threads} threads)"
+
+
+def preparar_local(args):
+    """Popula um SQLite temporário, sobe o servidor e retorna (url, token, ids, descrição)."""
+    usar_banco_temporario("bench_carga_")
+    os.environ.setdefault("WAITRESS_THREADS", str(args.threads))
+
+    from flask_jwt_extended import create_access_token
+    from app import app, db
+
+    popular(args.clientes, 10)
+    with app.app_context():
+        token = create_access_token(identity="bench-carga")
+        pool = db.engine.pool
+
+    url, descricao = subir_servidor(app, args.threads)
+    return url, token, list(range(1, args.clientes + 1)), f"{descricao}, pool {pool.__class__.__name__}"
+
+
+def carga(url, token, ids, concorrencia, segundos):
+    """Retorna (latências ordenadas em ms, erros, segundos decorridos)."""
+    destino = urlsplit(url)
+    headers = {"Authorization": f"Bearer {token}"}
+    latencias, erros = [], [0]
+    trava = threading.Lock()
+    fim = time.perf_counter() + segundos
+
+    def trabalhador():
+        sorteio = random.Random()
+        locais, falhas = [], 0
+        while time.perf_counter() < fim:
+            if sorteio.random() < 0.3:
+                caminho = "/api/clientes?limite=100&ordenar=nome"
+            else:
+                caminho = f"/api/clientes/{sorteio.choice(ids)}/categorias"
+            conexao = http.client.HTTPConnection(destino.hostname, destino.port, timeout=30)
+            inicio = time.perf_counter()
+            try:
+                conexao.request("GET", caminho, headers=headers)
+                resposta = conexao.getresponse()
+                resposta.read()
+                if resposta.status >= 400:
+                    falhas += 1
+            except OSError:
+                falhas += 1
+            finally:
+                conexao.close()
+            locais.append((time.perf_counter() - inicio) * 1000)
+        with trava:
+            latencias.extend(locais)
+            erros[0] += falhas
+
+    grupo = [threading.Thread(target=trabalhador) for _ in range(concorrencia)]
+    inicio = time.perf_counter()
+    for t in grupo:
+        t.start()
+    for t in grupo:
+        t.join()
+    return sorted(latencias), erros[0], time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concorrencia", default="1,2,4,8,16,32")
+    parser.add_argument("--segundos", type=float, default=3)
+    parser.add_argument("--threads", type=int, default=8, help="Threads do servidor local (WAITRESS_THREADS)")
+    parser.add_argument("--clientes", type=int, default=2000)
+    parser.add_argument("--url", help="Servidor já rodando (não sobe o local)")
+    parser.add_argument("--token", help="JWT para o servidor informado em --url")
+    parser.add_argument("--ids", default="1-100", help="Faixa de ids de clientes para --url (ex.: 1-100)")
+    args = parser.parse_args()
+
+    if args.url:
+        if not args.token:
+            parser.error("--url exige --token")
+        inicio_ids, fim_ids = (int(x) for x in args.ids.split("-"))
+        url, token, ids, descricao = args.url.rstrip("/"), args.token, list(range(inicio_ids, fim_ids + 1)), args.url
+    else:
+        print(f">>> Populando {args.clientes} clientes / {args.clientes * 10} categorias...")
+        url, token, ids, descricao = preparar_local(args)
+
+    print(f">>> Servidor: {descricao}")
+    print(f"{'concorrência':>12} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'erros':>7}")
+    for concorrencia in (int(n) for n in args.concorrencia.split(",")):
+        latencias, erros, decorrido = carga(url, token, ids, concorrencia, args.segundos)
+        print(f"{concorrencia:>12} {len(latencias) / decorrido:>9.1f} {percentil(latencias, 0.50):>9.1f} "
+              f"{percentil(latencias, 0.99):>9.1f} {erros:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark da rota GET /api/clientes.
+
+Popula um SQLite temporário com 10 mil clientes e 200 mil categorias e mede
+o tempo e o NÚMERO DE CONSULTAS por requisição. O número de consultas deve
+ser constante (não pode crescer com a quantidade de clientes).
+
+Uso (a partir da raiz do projeto):
+    python benchmarks/bench_clientes.py [--clientes 10000] [--categorias-por-cliente 20]
+"""
+import argparse
+import time
+
+from banco_temporario import popular, usar_banco_temporario
+
+usar_banco_temporario("bench_clientes_")
+
+from flask_jwt_extended import create_access_token  # noqa: E402
+
+from app import app  # noqa: E402
+from metricas import capturar_consultas  # noqa: E402
+
+
+def medir(cliente_http, headers, url):
+    with capturar_consultas() as captura:
+        inicio = time.perf_counter()
+        resposta = cliente_http.get(url, headers=headers)
+        decorrido = time.perf_counter() - inicio
+    assert resposta.status_code == 200, resposta.get_data(as_text=True)
+    return resposta, decorrido, captura.total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clientes", type=int, default=10000)
+    parser.add_argument("--categorias-por-cliente", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f">>> Populando {args.clientes} clientes / {args.clientes * args.categorias_por_cliente} categorias...")
+    popular(args.clientes, args.categorias_por_cliente)
+
+    with app.app_context():
+        headers = {"Authorization": f"Bearer {create_access_token(identity='benchmark')}"}
+
+    cliente_http = app.test_client()
+    contagens = set()
+
+    cenarios = [
+        "/api/clientes",
+        "/api/clientes?grupo=GRUPO%207",
+        "/api/clientes?situacao=pendente&ordenar=concluidas&direcao=desc",
+        "/api/clientes?limite=100&ordenar=nome",
+    ]
+    for url in cenarios:
+        resposta, decorrido, consultas = medir(cliente_http, headers, url)
+        contagens.add(consultas)
+        print(f"{url:<70} {len(resposta.get_json()):>6} itens  {decorrido * 1000:8.1f} ms  {consultas} consulta(s)")
+
+    # Percorre algumas páginas seguindo o cursor
+    url = "/api/clientes?limite=500&ordenar=total_categorias"
+    for pagina in range(1, 6):
+        resposta, decorrido, consultas = medir(cliente_http, headers, url)
+        contagens.add(consultas)
+        print(f"pagina {pagina:<63} {len(resposta.get_json()):>6} itens  {decorrido * 1000:8.1f} ms  {consultas} consulta(s)")
+        cursor = resposta.headers.get("X-Proximo-Cursor")
+        if not cursor:
+            break
+        url = f"/api/clientes?limite=500&ordenar=total_categorias&cursor={cursor}"
+
+    assert len(contagens) == 1, f"Número de consultas variou entre requisições: {sorted(contagens)}"
+    print(f">>> OK: {contagens.pop()} consulta(s) por requisição, independente do volume.")
+
+
+if __name__ == "__main__":
+    main()
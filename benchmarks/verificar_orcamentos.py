@@ -0,0 +1,73 @@
+"""
+Verificação do orçamento de consultas ao banco por rota.
+
+Popula um SQLite temporário e chama cada rota com verificar_orcamento()
+(metricas.py). Falha com código de saída != 0 se alguma rota executar mais
+consultas que o seu orçamento, o que faz um N+1 reintroduzido quebrar o CI.
+Cada rota é medida com poucos e com muitos registros: o número de consultas
+não pode crescer com o volume.
+
+Uso (a partir da raiz do projeto):
+    python benchmarks/verificar_orcamentos.py
+"""
+import sys
+
+from banco_temporario import popular, usar_banco_temporario
+
+usar_banco_temporario("verificar_orcamentos_")
+
+from flask_jwt_extended import create_access_token  # noqa: E402
+
+from app import app  # noqa: E402
+from gerenciar_usuarios import criar  # noqa: E402
+from metricas import capturar_consultas, verificar_orcamento  # noqa: E402
+
+USUARIO, SENHA = "orcamento", "senha-do-orcamento"
+
+# (método, url, corpo JSON, máximo de consultas)
+ORCAMENTOS = [
+    ("POST", "/login", {"username": USUARIO, "password": SENHA}, 2),
+    ("GET", "/api/clientes", None, 2),
+    ("GET", "/api/clientes?situacao=pendente&ordenar=concluidas", None, 2),
+    ("GET", "/api/clientes/1/categorias", None, 3),
+    ("POST", "/api/categorias/confirmar", {"cliente_id": 1, "nome_categoria": "CATEGORIA 00", "status": "RECEBIDO"}, 3),
+    ("POST", "/api/clientes/1/categorias/status", {"status": "PENDENTE", "categorias": "todas"}, 5),
+]
+
+
+def main():
+    criar(USUARIO, SENHA)
+    with app.app_context():
+        headers = {"Authorization": f"Bearer {create_access_token(identity=USUARIO)}"}
+
+    cliente_http = app.test_client()
+    falhas = []
+    consultas_por_rota = {}
+
+    for volume in ((5, 3, 2), (50, 20, 5)):
+        popular(*volume)
+        print(f">>> {volume[0]} clientes, {volume[1]} categorias/cliente, {volume[2]} documentos/categoria")
+        for metodo, url, corpo, maximo in ORCAMENTOS:
+            try:
+                with capturar_consultas() as captura:
+                    resposta = verificar_orcamento(cliente_http, metodo, url, maximo, json=corpo, headers=headers)
+                assert resposta.status_code < 400, f"{metodo} {url} respondeu {resposta.status_code}"
+                situacao = "ok"
+            except AssertionError as e:
+                falhas.append(str(e))
+                situacao = "ESTOUROU"
+            consultas_por_rota.setdefault((metodo, url), set()).add(captura.total)
+            print(f"    {metodo:<5}{url:<60} {captura.total:>3} / {maximo} consulta(s)  {situacao}")
+
+    for (metodo, url), contagens in consultas_por_rota.items():
+        if len(contagens) > 1:
+            falhas.append(f"{metodo} {url}: número de consultas cresceu com o volume {sorted(contagens)}")
+
+    if falhas:
+        print("\n".join(["", ">>> FALHOU:"] + falhas))
+        sys.exit(1)
+    print(">>> OK: todas as rotas dentro do orçamento de consultas.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+# bucket.py
+"""
+Verificação dos documentos cobrados contra os arquivos enviados ao bucket.
+
+Os nomes dos arquivos enviados raramente são idênticos aos esperados
+(ex.: esperado '10.2025_ExtratoBB_ Loja 02.pdf', enviado '10.2025_ExtratoBB_Loja 2.pdf';
+esperado '09060-5_AplicAut.xls', enviado '09060-5.xls'). Por isso cada nome é
+reduzido a um conjunto de "tokens" normalizados (sem acento, caixa e zeros à
+esquerda; datas, números de conta e família da extensão em forma canônica) e a
+busca é feita em um índice montado UMA vez por listagem do prefixo do cliente.
+
+A busca custa O(tokens do nome) consultas a dicionário, independente da
+quantidade de arquivos no prefixo. Os documentos de um cliente são resolvidos
+juntos (IndiceArquivos.resolver): cada arquivo enviado atende no máximo um
+documento, e as correspondências exatas têm prioridade sobre as aproximadas.
+"""
+import hashlib
+import json
+import os
+import re
+import unicodedata
+
+# Prefixo raiz dos arquivos dos clientes no bucket
+PREFIXO_RAIZ = "arquivos_clientes"
+
+# Incrementar ao mudar tokenizar()/IndiceArquivos.resolver(): o mesmo bucket passa
+# a dar outro resultado, e os ETags calculados com a versão antiga deixam de valer
+VERSAO_CORRESPONDENCIA = 3
+
+_RE_EXTENSAO = re.compile(r"\.([a-z][a-z0-9]{0,4})$")
+_RE_DATA_COMPLETA = re.compile(r"(?<!\d)(\d{1,2})[./-](\d{1,2})[./-](\d{4})(?!\d)")
+_RE_MES_ANO = re.compile(r"(?<!\d)(\d{1,2})[./-](\d{4})(?!\d)")
+_RE_CONTA = re.compile(r"(?<![\d-])(\d+)-([\dx])(?![\d-])")
+_RE_SEPARADOR = re.compile(r"[^a-z0-9]+")
+_RE_PARENTESES = re.compile(r"\(.*?\)")
+
+# Extensões equivalentes viram o mesmo token ('.xls' e '.xlsx' casam; '.pdf' e '.xls' não)
+FAMILIAS_EXTENSAO = {
+    "xls": "planilha", "xlsx": "planilha", "xlsm": "planilha", "ods": "planilha", "csv": "planilha",
+    "doc": "texto", "docx": "texto", "odt": "texto",
+    "jpg": "imagem", "jpeg": "imagem", "png": "imagem",
+}
+
+
+def _sem_acentos(texto):
+    return unicodedata.normalize("NFKD", texto).encode("ascii", "ignore").decode("ascii")
+
+
+def prefixo_cliente(nome_cliente):
+    """
+    Prefixo do cliente no bucket: 'MERCADO VIOLETA (MATRIZ)' -> 'arquivos_clientes/mercado_violeta'.
+    Trechos entre parênteses (MATRIZ, FILIAL...) são ignorados.
+    """
+    nome = _RE_PARENTESES.sub(" ", _sem_acentos(nome_cliente).lower())
+    slug = _RE_SEPARADOR.sub("_", nome).strip("_")
+    return f"{PREFIXO_RAIZ}/{slug}"
+
+
+def tokenizar(nome_arquivo):
+    """
+    Reduz um nome de arquivo ao conjunto (frozenset) de tokens normalizados. A
+    extensão entra como '.<família>' ('.pdf', '.planilha'...): o mesmo extrato
+    em PDF e em XLS são documentos diferentes.
+    """
+    nome = _sem_acentos(os.path.basename(nome_arquivo)).lower().strip()
+
+    tokens = []
+    extensao = _RE_EXTENSAO.search(nome)
+    if extensao:
+        tokens.append("." + FAMILIAS_EXTENSAO.get(extensao.group(1), extensao.group(1)))
+        nome = nome[:extensao.start()]
+
+    def _data_completa(m):
+        tokens.append(f"{m.group(3)}-{int(m.group(2)):02d}-{int(m.group(1)):02d}")
+        return " "
+
+    def _mes_ano(m):
+        tokens.append(f"{m.group(2)}-{int(m.group(1)):02d}")
+        return " "
+
+    def _conta(m):
+        tokens.append(f"{int(m.group(1))}-{m.group(2)}")
+        return " "
+
+    nome = _RE_DATA_COMPLETA.sub(_data_completa, nome)
+    nome = _RE_MES_ANO.sub(_mes_ano, nome)
+    nome = _RE_CONTA.sub(_conta, nome)
+
+    for parte in _RE_SEPARADOR.split(nome):
+        if not parte:
+            continue
+        tokens.append(str(int(parte)) if parte.isdigit() else parte)
+
+    if all(token.startswith(".") for token in tokens):
+        return frozenset() # Só a extensão não identifica documento nenhum
+    return frozenset(tokens)
+
+
+def _hash_arquivo(arquivo):
+    return int.from_bytes(hashlib.blake2b(arquivo.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def _numerico(token):
+    return any(c.isdigit() for c in token)
+
+
+def _variacoes(tokens):
+    """
+    O conjunto sem UMA de suas palavras. Tokens com dígitos (conta, data, loja 2...)
+    identificam o documento e nunca são descartados; e precisa sobrar ao menos um.
+    A extensão também nunca é descartada. Ordem fixa, para o resultado não
+    depender do hash das strings (muda a cada processo).
+    """
+    if not any(_numerico(token) for token in tokens):
+        return
+    for token in sorted(tokens):
+        if not _numerico(token) and not token.startswith("."):
+            yield tokens - {token}
+
+
+class IndiceArquivos:
+    """
+    Índice dos arquivos de UM prefixo, montado a partir de uma listagem.
+
+    Níveis de correspondência (do mais forte para o mais fraco):
+      1. mesmo conjunto de tokens
+      2. o arquivo enviado tem uma palavra a menos que o esperado ('09060-5.xls' x '09060-5_AplicAut.xls')
+      3. o arquivo enviado tem uma palavra a mais que o esperado
+    Apenas palavras podem faltar/sobrar; números e a família da extensão precisam
+    coincidir ('Loja 05' x 'Loja 2' não casa, '6779-2.PDF' x '6779-2.XLS' também não).
+    Trocar uma palavra por outra não casa: 'NF 123 janeiro' x 'NF 123 fevereiro' são documentos diferentes.
+    """
+
+    def __init__(self, arquivos):
+        self.arquivos = set()
+        # Mantidos a cada inclusão/remoção, sem percorrer a listagem: XOR dos hashes
+        # dos nomes (muda sempre que o conjunto muda) e soma dos tamanhos dos nomes
+        self.assinatura = 0
+        self.caracteres = 0
+        # chave (frozenset de tokens) -> arquivos com essa chave, na ordem de inclusão.
+        # Depois de montado o índice, uma lista publicada nunca é alterada: adicionar()
+        # e remover() trocam a lista inteira, e uma busca concorrente (fora da trava
+        # do cache) vê a lista antiga ou a nova, nunca uma pela metade.
+        self._exato = {}
+        self._reduzido = {}
+
+        for arquivo in arquivos:
+            self._incluir(arquivo, copiar=False) # Ninguém lê o índice durante a montagem
+
+    def __len__(self):
+        return len(self.arquivos)
+
+    def _chaves(self, tokens):
+        yield self._exato, tokens
+        for variacao in _variacoes(tokens):
+            yield self._reduzido, variacao
+
+    def _incluir(self, arquivo, copiar):
+        if arquivo in self.arquivos:
+            return
+        self.arquivos.add(arquivo)
+        self.assinatura ^= _hash_arquivo(arquivo)
+        self.caracteres += len(arquivo)
+        tokens = tokenizar(arquivo)
+        if not tokens:
+            return
+        for mapa, chave in self._chaves(tokens):
+            if copiar:
+                mapa[chave] = mapa.get(chave, []) + [arquivo]
+            else:
+                mapa.setdefault(chave, []).append(arquivo)
+
+    def adicionar(self, arquivo):
+        """Inclui um arquivo no índice (atualização incremental)."""
+        self._incluir(arquivo, copiar=True)
+
+    def remover(self, arquivo):
+        """Retira um arquivo do índice. Ignora arquivos desconhecidos."""
+        if arquivo not in self.arquivos:
+            return
+        self.arquivos.discard(arquivo)
+        self.assinatura ^= _hash_arquivo(arquivo)
+        self.caracteres -= len(arquivo)
+        tokens = tokenizar(arquivo)
+        if not tokens:
+            return
+        for mapa, chave in self._chaves(tokens):
+            restantes = [outro for outro in mapa.get(chave, ()) if outro != arquivo]
+            if restantes:
+                mapa[chave] = restantes
+            else:
+                mapa.pop(chave, None)
+
+    def _candidatos(self, tokens, nivel):
+        """Gera as listas de arquivos que atendem 'tokens' no nível de correspondência indicado (1, 2 ou 3)."""
+        if nivel == 1:
+            yield self._exato.get(tokens)
+        elif nivel == 2:
+            for variacao in _variacoes(tokens):
+                yield self._exato.get(variacao)
+        else:
+            yield self._reduzido.get(tokens)
+
+    def resolver(self, nomes_esperados):
+        """
+        Retorna, na ordem de 'nomes_esperados', o arquivo correspondente a cada
+        documento (ou None). Nível por nível, cada documento ainda sem arquivo
+        pega o primeiro arquivo que nenhum outro documento usou: um arquivo
+        atende no máximo um documento, e quem casa exatamente escolhe primeiro.
+        Passe todos os documentos do cliente de uma vez.
+        """
+        tokens = [tokenizar(nome) for nome in nomes_esperados]
+        encontrados = [None] * len(tokens)
+        usados = set()
+
+        for nivel in (1, 2, 3):
+            for posicao, chave in enumerate(tokens):
+                if encontrados[posicao] is not None or not chave:
+                    continue
+                for arquivos in self._candidatos(chave, nivel):
+                    livre = next((arquivo for arquivo in arquivos or () if arquivo not in usados), None)
+                    if livre is not None:
+                        encontrados[posicao] = livre
+                        usados.add(livre)
+                        break
+
+        return encontrados
+
+    def buscar(self, nome_esperado):
+        """Retorna o nome do arquivo correspondente a um único documento no bucket, ou None."""
+        return self.resolver([nome_esperado])[0]
+
+
+# ---------------------------------------------
+# ARMAZENAMENTOS (BACKENDS DE LISTAGEM)
+# ---------------------------------------------
+
+class Armazenamento:
+    """Interface mínima de um backend: listar os nomes de arquivo sob um prefixo."""
+
+    def listar(self, prefixo):
+        raise NotImplementedError
+
+    def geracao(self, prefixo):
+        """
+        Número de geração barato de consultar, que muda quando o conteúdo do prefixo muda.
+        None = não suportado (o cache relista o prefixo quando o TTL expira).
+        """
+        return None
+
+
+class ArmazenamentoJSON(Armazenamento):
+    """Simulação do GCS a partir de um JSON {prefixo: [arquivos]} (ex.: data/arquivos_simulados_gcs.json)."""
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self._mtime = None
+        self._dados = {}
+        self._carregar()
+
+    def _carregar(self):
+        mtime = os.stat(self.caminho).st_mtime_ns
+        if mtime != self._mtime:
+            with open(self.caminho, "r", encoding="utf-8") as f:
+                self._dados = json.load(f)
+            self._mtime = mtime
+
+    def listar(self, prefixo):
+        self._carregar()
+        return list(self._dados.get(prefixo.rstrip("/"), []))
+
+    def geracao(self, prefixo):
+        return os.stat(self.caminho).st_mtime_ns
+
+
+class ArmazenamentoLocal(Armazenamento):
+    """Diretório local em que cada prefixo é uma subpasta (<raiz>/arquivos_clientes/<cliente>/...)."""
+
+    def __init__(self, raiz):
+        self.raiz = raiz
+
+    def listar(self, prefixo):
+        pasta = os.path.join(self.raiz, prefixo)
+        if not os.path.isdir(pasta):
+            return []
+        arquivos = []
+        for atual, _, nomes in os.walk(pasta):
+            relativo = os.path.relpath(atual, pasta)
+            for nome in nomes:
+                arquivos.append(nome if relativo == "." else os.path.join(relativo, nome))
+        return arquivos
+
+    def geracao(self, prefixo):
+        # mtime da pasta do prefixo: muda quando arquivos são criados/removidos nela
+        # (alterações só em subpastas não são percebidas; o TTL do cache cobre esse caso)
+        try:
+            return os.stat(os.path.join(self.raiz, prefixo)).st_mtime_ns
+        except FileNotFoundError:
+            return 0
+
+
+class ArmazenamentoGCS(Armazenamento):
+    """Google Cloud Storage. Requer o pacote opcional 'google-cloud-storage'."""
+
+    def __init__(self, nome_bucket):
+        try:
+            from google.cloud import storage
+        except ImportError as e:
+            raise RuntimeError("Instale 'google-cloud-storage' para usar o armazenamento GCS.") from e
+        self._bucket = storage.Client().bucket(nome_bucket)
+
+    def listar(self, prefixo):
+        prefixo = prefixo.rstrip("/") + "/"
+        return [blob.name[len(prefixo):] for blob in self._bucket.list_blobs(prefix=prefixo)]
+
+
+def criar_armazenamento(configuracao):
+    """
+    Cria o backend a partir de uma string '<tipo>:<alvo>':
+      json:data/arquivos_simulados_gcs.json | local:/caminho/raiz | gcs:nome-do-bucket
+    """
+    tipo, _, alvo = (configuracao or "").partition(":")
+    if tipo == "json":
+        return ArmazenamentoJSON(alvo)
+    if tipo == "local":
+        return ArmazenamentoLocal(alvo)
+    if tipo == "gcs":
+        return ArmazenamentoGCS(alvo)
+    raise ValueError(f"Armazenamento desconhecido: '{configuracao}'")
+
+
+class VerificadorBucket:
+    """Resolve os documentos esperados de um cliente contra a listagem do seu prefixo."""
+
+    def __init__(self, armazenamento):
+        self.armazenamento = armazenamento
+
+    def indice(self, prefixo):
+        """Lista o prefixo uma vez e monta o índice (um 'snapshot' da listagem)."""
+        return IndiceArquivos(self.armazenamento.listar(prefixo))
+
+    def verificar(self, prefixo, nomes_esperados):
+        """Retorna {nome_esperado: arquivo_encontrado ou None} (todos os documentos do cliente)."""
+        nomes = list(nomes_esperados)
+        return dict(zip(nomes, self.indice(prefixo).resolver(nomes)))
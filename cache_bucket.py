@@ -0,0 +1,203 @@
+# cache_bucket.py
+"""
+Cache das listagens do bucket por prefixo de cliente (arquivos_clientes/<slug>).
+
+Cada entrada guarda o índice de arquivos do prefixo (bucket.IndiceArquivos) e os
+resultados já calculados por categoria, de modo que um acerto no cache não faz
+nenhuma chamada ao armazenamento nem repete as buscas no índice.
+
+- TTL: depois de 'ttl' segundos a entrada é revalidada. Se o backend informa um
+  número de geração (Armazenamento.geracao) e ele não mudou, a entrada só é
+  renovada, sem relistar o prefixo.
+- Notificações: notificar() aplica arquivos criados/removidos diretamente no
+  índice (atualização incremental, sem relistar). A notificação não é
+  conferida no armazenamento, então a entrada perde a geração: quando o TTL
+  expira ela é relistada, e uma notificação errada dura no máximo um TTL.
+- LRU: com mais de 'max_prefixos' entradas ou acima de 'memoria_maxima' bytes
+  (estimativa), as entradas menos usadas são descartadas.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from bucket import VERSAO_CORRESPONDENCIA, IndiceArquivos, VerificadorBucket
+
+# Estimativa de bytes por arquivo indexado (chaves, listas e variações no índice)
+BYTES_POR_ARQUIVO = 600
+
+
+def _assinatura(indice):
+    """
+    Versão da listagem (usada nos ETags da API): hash do conteúdo, e não um
+    contador do processo, para ser a mesma entre reinícios e entre instâncias.
+    Inclui a versão das regras de correspondência, que também mudam a resposta.
+    O índice mantém o hash a cada alteração; aqui não se percorre a listagem.
+    """
+    return f"{VERSAO_CORRESPONDENCIA}.{indice.assinatura:016x}"
+
+
+class _Entrada:
+    __slots__ = ("indice", "geracao", "expira_em", "tamanho", "resultados", "versao")
+
+    def __init__(self, indice, geracao, expira_em):
+        self.indice = indice
+        self.versao = _assinatura(indice)
+        self.geracao = geracao
+        self.expira_em = expira_em
+        self.resultados = {} # chave (id do cliente) -> (nomes, arquivos encontrados)
+        self.recalcular_tamanho()
+
+    def recalcular_tamanho(self):
+        self.tamanho = self.indice.caracteres + BYTES_POR_ARQUIVO * len(self.indice)
+
+
+class CacheListagem(VerificadorBucket):
+    """VerificadorBucket com cache de listagens por prefixo. Seguro para uso entre threads."""
+
+    def __init__(self, armazenamento, ttl=300, memoria_maxima=64 * 1024 * 1024,
+                 max_prefixos=1000, relogio=time.monotonic):
+        super().__init__(armazenamento)
+        self.ttl = ttl
+        self.memoria_maxima = memoria_maxima
+        self.max_prefixos = max_prefixos
+        self._relogio = relogio
+        self._entradas = OrderedDict()
+        self._memoria = 0
+        self._trava = threading.Lock()
+        self._contadores = {
+            "acertos": 0,
+            "falhas": 0,
+            "expulsoes": 0,
+            "revalidacoes": 0,
+            "atualizacoes_incrementais": 0,
+            "listagens": 0,
+        }
+
+    # ---------------------------------------------
+    # CONSULTA
+    # ---------------------------------------------
+
+    def _entrada(self, prefixo):
+        """Retorna a entrada válida do prefixo, listando o armazenamento só se necessário."""
+        agora = self._relogio()
+
+        with self._trava:
+            entrada = self._entradas.get(prefixo)
+            if entrada is not None and entrada.expira_em > agora:
+                self._entradas.move_to_end(prefixo)
+                self._contadores["acertos"] += 1
+                return entrada
+
+        # Expirada: se a geração não mudou, apenas renova o TTL
+        if entrada is not None:
+            geracao = self.armazenamento.geracao(prefixo)
+            if geracao is not None and geracao == entrada.geracao:
+                with self._trava:
+                    entrada.expira_em = agora + self.ttl
+                    self._contadores["revalidacoes"] += 1
+                return entrada
+
+        # Falha: lista o prefixo (fora da trava, pode ser lento)
+        geracao = self.armazenamento.geracao(prefixo)
+        indice = IndiceArquivos(self.armazenamento.listar(prefixo))
+        nova = _Entrada(indice, geracao, agora + self.ttl)
+
+        with self._trava:
+            self._contadores["falhas"] += 1
+            self._contadores["listagens"] += 1
+            self._remover(prefixo)
+            self._entradas[prefixo] = nova
+            self._memoria += nova.tamanho
+            self._expulsar()
+        return nova
+
+    def indice(self, prefixo):
+        return self._entrada(prefixo).indice
+
+    def versao(self, prefixo):
+        """Hash da listagem do prefixo: muda sempre que o conteúdo dela muda."""
+        return self._entrada(prefixo).versao
+
+    def verificar_documentos(self, prefixo, chave, nomes_esperados):
+        """
+        Retorna a lista de arquivos encontrados (ou None) para TODOS os documentos
+        de um cliente (ver IndiceArquivos.resolver). O resultado fica guardado na
+        entrada do prefixo sob 'chave' (ex.: id do cliente; clientes MATRIZ/FILIAL
+        dividem o prefixo) enquanto a listagem e a lista de nomes não mudarem.
+        """
+        nomes = tuple(nomes_esperados)
+        entrada = self._entrada(prefixo)
+
+        # notificar() troca o dicionário inteiro; um resultado calculado durante a
+        # troca vai para o dicionário antigo e é descartado junto com ele
+        resultados = entrada.resultados
+        guardado = resultados.get(chave)
+        if guardado is not None and guardado[0] == nomes:
+            return guardado[1]
+
+        # Fora da trava: o índice troca listas inteiras em vez de alterá-las (ver IndiceArquivos)
+        encontrados = entrada.indice.resolver(nomes)
+        resultados[chave] = (nomes, encontrados)
+        return encontrados
+
+    # ---------------------------------------------
+    # INVALIDAÇÃO E ATUALIZAÇÃO INCREMENTAL
+    # ---------------------------------------------
+
+    def notificar(self, prefixo, adicionados=(), removidos=()):
+        """
+        Aplica uma notificação de alteração no prefixo (arquivos criados/removidos).
+        Prefixos fora do cache são ignorados: serão listados na próxima consulta.
+        A entrada alterada é relistada na próxima expiração do TTL.
+        """
+        with self._trava:
+            entrada = self._entradas.get(prefixo)
+            if entrada is None:
+                return False
+            for arquivo in removidos:
+                entrada.indice.remover(arquivo)
+            for arquivo in adicionados:
+                entrada.indice.adicionar(arquivo)
+            entrada.resultados = {}
+            # Não renova a geração: o índice agora pode divergir do armazenamento
+            # (notificação errada ou forjada) e só uma listagem o corrige
+            entrada.geracao = None
+            entrada.versao = _assinatura(entrada.indice)
+
+            self._memoria -= entrada.tamanho
+            entrada.recalcular_tamanho()
+            self._memoria += entrada.tamanho
+            self._contadores["atualizacoes_incrementais"] += 1
+            self._expulsar()
+            return True
+
+    def invalidar(self, prefixo=None):
+        """Descarta um prefixo (ou todo o cache, se prefixo=None)."""
+        with self._trava:
+            if prefixo is None:
+                self._entradas.clear()
+                self._memoria = 0
+            else:
+                self._remover(prefixo)
+
+    def _remover(self, prefixo):
+        entrada = self._entradas.pop(prefixo, None)
+        if entrada is not None:
+            self._memoria -= entrada.tamanho
+
+    def _expulsar(self):
+        # Mantém ao menos a entrada mais recente, mesmo que sozinha passe do limite
+        while len(self._entradas) > 1 and (
+            len(self._entradas) > self.max_prefixos or self._memoria > self.memoria_maxima
+        ):
+            _, entrada = self._entradas.popitem(last=False)
+            self._memoria -= entrada.tamanho
+            self._contadores["expulsoes"] += 1
+
+    # ---------------------------------------------
+    # ESTATÍSTICAS
+    # ---------------------------------------------
+
+    def estatisticas(self):
+        with self._trava:
+            return dict(self._contadores, prefixos=len(self._entradas), memoria_estimada=self._memoria)
@@ -0,0 +1,140 @@
+# cache_respostas.py
+"""
+Respostas condicionais (ETag / If-None-Match) com cache local das respostas já
+renderizadas.
+
+A rota calcula um ETag barato (ex.: a partir de Cliente.versao) ANTES de montar
+a resposta. Se este processo já renderizou essa versão, o corpo (JSON compacto
+e suas versões comprimidas) e os cabeçalhos extras são reaproveitados; senão a
+resposta é montada. Se o navegador já tem essa versão, a resposta é 304 sem
+corpo e sem montar nada (nenhuma consulta além do ETag); os cabeçalhos extras
+só são repetidos no 304 quando essa versão já está no cache.
+
+O cache é local ao processo e limitado em quantidade de entradas (LRU). As
+escritas chamam invalidar() para liberar as entradas afetadas logo; entradas
+antigas de outros processos são descartadas de qualquer forma porque o ETag muda.
+"""
+import gzip
+import threading
+from collections import OrderedDict
+
+from flask import Response, current_app, request
+
+try:
+    import brotli # Opcional: pip install brotli
+except ImportError:
+    brotli = None
+
+# Corpos menores que isso não compensam a compressão
+TAMANHO_MINIMO_COMPRESSAO = 1024
+
+
+class _Renderizada:
+    __slots__ = ("etag", "corpo", "cabecalhos", "comprimidos")
+
+    def __init__(self, etag, corpo, cabecalhos):
+        self.etag = etag
+        self.corpo = corpo
+        self.cabecalhos = cabecalhos
+        self.comprimidos = {} # codificação -> bytes
+
+
+def _codificacao_aceita(tamanho):
+    """Escolhe 'br', 'gzip' ou None conforme o Accept-Encoding da requisição."""
+    if tamanho < TAMANHO_MINIMO_COMPRESSAO:
+        return None
+    aceitas = request.accept_encodings
+    if brotli is not None and aceitas["br"]:
+        return "br"
+    if aceitas["gzip"]:
+        return "gzip"
+    return None
+
+
+def _comprimir(corpo, codificacao):
+    if codificacao == "br":
+        return brotli.compress(corpo, quality=5)
+    return gzip.compress(corpo, compresslevel=6)
+
+
+def _etag_da_codificacao(etag, codificacao):
+    # ETag forte é por representação: a versão comprimida tem o seu próprio
+    return etag if codificacao is None else f"{etag}-{codificacao}"
+
+
+class CacheRespostas:
+    """Cache LRU de respostas renderizadas, indexado por uma chave em tupla."""
+
+    def __init__(self, max_entradas=512):
+        self.max_entradas = max_entradas
+        self._entradas = OrderedDict()
+        self._trava = threading.Lock()
+
+    def responder(self, chave, versao, gerar):
+        """
+        Devolve a Response da rota.
+
+        chave  -> identifica a resposta (ex.: ("cliente", 42))
+        versao -> string que muda sempre que o conteúdo muda; vira o ETag
+        gerar  -> função sem argumentos que retorna (payload, cabecalhos_extras)
+        """
+        etag = versao
+        etag_aceito = None
+        for codificacao in (None, "gzip", "br"):
+            if request.if_none_match.contains(_etag_da_codificacao(etag, codificacao)):
+                etag_aceito = _etag_da_codificacao(etag, codificacao)
+                break
+
+        with self._trava:
+            renderizada = self._entradas.get(chave)
+            if renderizada is not None and renderizada.etag == etag:
+                self._entradas.move_to_end(chave)
+            else:
+                renderizada = None
+
+        if etag_aceito is not None:
+            # O navegador já tem essa versão: 304 sem montar a resposta. Os
+            # cabeçalhos extras só vão junto se esta versão já estiver no cache
+            return self._cabecalhos(Response(status=304), renderizada, etag_aceito)
+
+        if renderizada is None:
+            payload, cabecalhos = gerar()
+            # Pelo JSON provider do app, para o tempo de serialização entrar nas métricas
+            corpo = current_app.json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            renderizada = _Renderizada(etag, corpo, cabecalhos or {})
+            with self._trava:
+                self._entradas[chave] = renderizada
+                self._entradas.move_to_end(chave)
+                while len(self._entradas) > self.max_entradas:
+                    self._entradas.popitem(last=False)
+
+        codificacao = _codificacao_aceita(len(renderizada.corpo))
+        corpo = renderizada.corpo
+        if codificacao:
+            corpo = renderizada.comprimidos.get(codificacao)
+            if corpo is None:
+                corpo = _comprimir(renderizada.corpo, codificacao)
+                renderizada.comprimidos[codificacao] = corpo
+
+        resposta = Response(corpo, mimetype="application/json")
+        if codificacao:
+            resposta.headers["Content-Encoding"] = codificacao
+        return self._cabecalhos(resposta, renderizada, _etag_da_codificacao(etag, codificacao))
+
+    @staticmethod
+    def _cabecalhos(resposta, renderizada, etag_representacao):
+        """Cabeçalhos comuns ao 200 e ao 304 (o 304 deve repetir ETag, Cache-Control, Vary e os extras)."""
+        resposta.set_etag(etag_representacao)
+        resposta.vary.add("Accept-Encoding")
+        resposta.cache_control.private = True
+        resposta.cache_control.no_cache = True # Sempre revalidar com o ETag
+        if renderizada is not None:
+            for nome, valor in renderizada.cabecalhos.items():
+                resposta.headers[nome] = valor
+        return resposta
+
+    def invalidar(self, *prefixo):
+        """Remove as entradas cuja chave começa com 'prefixo' (sem argumentos: todas)."""
+        with self._trava:
+            for chave in [c for c in self._entradas if c[:len(prefixo)] == prefixo]:
+                del self._entradas[chave]
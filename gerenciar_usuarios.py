@@ -0,0 +1,60 @@
+"""
+Gerenciamento dos usuários da API (tabela 'usuarios').
+
+Comandos:
+    python gerenciar_usuarios.py inicializar
+        Cria a tabela e, se ela estiver vazia, cadastra o usuário de teste que
+        antes ficava fixo no código ('auditoria', senha '123456'). Idempotente.
+
+    python gerenciar_usuarios.py criar <username> [--senha SENHA]
+        Cria o usuário (ou troca a senha) com a política de hash atual.
+        Sem --senha, a senha é pedida no terminal.
+"""
+import argparse
+import getpass
+
+from app import app, db, verificador_senhas
+from models import Usuario
+
+# Hash do antigo USUARIO_TESTE de app.py (senha: '123456')
+HASH_USUARIO_TESTE = "$pbkdf2-sha256$29000$.j/HuJeScu4dY0xJidEaQw$AOydwozsEvwPgCTORrIOzup7Nj7.iLnXvva..N3zUQA"
+
+
+def inicializar():
+    with app.app_context():
+        db.create_all()
+        if db.session.query(Usuario.id).first():
+            print(">>> Já existem usuários cadastrados. Nada a fazer.")
+            return
+        db.session.add(Usuario(username="auditoria", password_hash=HASH_USUARIO_TESTE))
+        db.session.commit()
+        print(">>> Usuário de teste 'auditoria' cadastrado.")
+
+
+def criar(username, senha):
+    with app.app_context():
+        db.create_all()
+        usuario = Usuario.query.filter_by(username=username).first()
+        if usuario is None:
+            usuario = Usuario(username=username)
+            db.session.add(usuario)
+        usuario.password_hash = verificador_senhas.contexto.hash(senha)
+        usuario.ativo = True
+        db.session.commit()
+        print(f">>> Usuário '{username}' salvo.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gerencia os usuários da API.")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+    comandos.add_parser("inicializar", help="Cria a tabela e o usuário de teste, se vazia")
+    parser_criar = comandos.add_parser("criar", help="Cria um usuário ou troca a sua senha")
+    parser_criar.add_argument("username")
+    parser_criar.add_argument("--senha", help="Senha (se omitida, é pedida no terminal)")
+    args = parser.parse_args()
+
+    if args.comando == "inicializar":
+        inicializar()
+    else:
+        senha = args.senha or getpass.getpass("Senha: ")
+        criar(args.username, senha)
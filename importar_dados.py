@@ -0,0 +1,374 @@
+"""
+Importação dos dados mestres (clientes, categorias e documentos).
+
+Substitui a carga que era feita na inicialização do app. O arquivo é lido em
+fluxo, um cliente por vez, e gravado em lotes com inserções de várias linhas
+(COPY para os documentos no PostgreSQL), com memória limitada ao tamanho do lote.
+
+A importação é incremental e pode ser repetida:
+  - clientes: upsert pelo 'id' dos dados mestres (nome/grupo/segmento atualizados).
+    Antes de gravar, os ids são conferidos com o banco (ver verificar_identificadores):
+    um banco populado com ids automáticos não bate com os ids dos dados mestres, e o
+    upsert duplicaria clientes ou renomearia um cliente não relacionado;
+  - categorias: INSERT ... ON CONFLICT em _cliente_categoria_uc. Categorias
+    existentes são mantidas, então o status de recebimento já marcado não é perdido;
+  - documentos: só são inseridos os que ainda não existem na categoria.
+Só os clientes alterados (dados, categorias ou documentos novos) ganham nova
+versão; repetir a importação sem mudanças não invalida os ETags da API.
+
+Formatos aceitos (pela extensão, ou --formato):
+  .json   lista de clientes, como data/dados_mestres.json
+  .ndjson um cliente (mesmo formato do JSON) por linha
+  .csv    uma linha por documento: id,nome,grupo,segmento,categoria,documento[,status_recebimento]
+
+Uso:
+    python importar_dados.py data/dados_mestres.json [--lote 1000] [--permitir-renomear]
+"""
+import argparse
+import csv
+import io
+import json
+import time
+from datetime import datetime
+
+from sqlalchemy import or_, text, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app import app, db
+from models import Cliente, Categoria, Documento
+
+TAMANHO_BLOCO = 64 * 1024
+
+
+# ---------------------------------------------
+# LEITORES (um cliente por vez)
+# ---------------------------------------------
+
+def ler_json(arquivo):
+    """Percorre uma lista JSON de objetos sem carregar o arquivo inteiro na memória."""
+    decodificador = json.JSONDecoder()
+    buffer = arquivo.read(TAMANHO_BLOCO).lstrip()
+    if not buffer.startswith("["):
+        raise ValueError("O arquivo JSON deve conter uma lista de clientes.")
+    posicao = 1
+
+    while True:
+        # Pula espaços e vírgulas entre os objetos, lendo mais do arquivo se preciso
+        while True:
+            while posicao < len(buffer) and buffer[posicao] in " \t\r\n,":
+                posicao += 1
+            if posicao < len(buffer):
+                break
+            buffer, posicao = arquivo.read(TAMANHO_BLOCO), 0
+            if not buffer:
+                raise ValueError("JSON incompleto: ']' final não encontrado.")
+
+        if buffer[posicao] == "]":
+            return
+
+        try:
+            objeto, fim_objeto = decodificador.raw_decode(buffer, posicao)
+        except json.JSONDecodeError:
+            # Objeto cortado no fim do bloco: junta o próximo bloco e tenta de novo
+            bloco = arquivo.read(TAMANHO_BLOCO)
+            if not bloco:
+                raise
+            buffer, posicao = buffer[posicao:] + bloco, 0
+            continue
+
+        yield objeto
+        posicao = fim_objeto
+
+
+def ler_ndjson(arquivo):
+    for linha in arquivo:
+        if linha.strip():
+            yield json.loads(linha)
+
+
+def ler_csv(arquivo):
+    """Agrupa linhas consecutivas do mesmo cliente/categoria em um registro de cliente."""
+    atual = None
+    for linha in csv.DictReader(arquivo):
+        cliente_id = int(linha["id"])
+        if atual is None or atual["id"] != cliente_id:
+            if atual is not None:
+                yield atual
+            atual = {
+                "id": cliente_id,
+                "nome": linha["nome"],
+                "grupo": linha["grupo"],
+                "segmento": linha["segmento"],
+                "categorias": [],
+            }
+
+        categorias = atual["categorias"]
+        if not categorias or categorias[-1]["nome"] != linha["categoria"]:
+            categoria = {"nome": linha["categoria"], "documentos": []}
+            if linha.get("status_recebimento"):
+                categoria["status_recebimento"] = linha["status_recebimento"]
+            categorias.append(categoria)
+        if linha.get("documento"):
+            categorias[-1]["documentos"].append(linha["documento"])
+
+    if atual is not None:
+        yield atual
+
+
+LEITORES = {"json": ler_json, "ndjson": ler_ndjson, "csv": ler_csv}
+
+
+# ---------------------------------------------
+# GRAVAÇÃO EM LOTE
+# ---------------------------------------------
+
+def _insert(tabela):
+    """INSERT com suporte a ON CONFLICT para o banco em uso."""
+    dialeto = db.engine.dialect.name
+    if dialeto == "postgresql":
+        return postgresql.insert(tabela)
+    if dialeto == "sqlite":
+        return sqlite.insert(tabela)
+    raise RuntimeError(f"Importação não suportada para o banco '{dialeto}'.")
+
+
+def _copiar_documentos(linhas):
+    """Insere documentos com COPY (PostgreSQL), dentro da transação da sessão."""
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    for linha in linhas:
+        escritor.writerow([linha["categoria_id"], linha["nome"], linha["status_bucket"],
+                           linha["data_criacao"].isoformat(), linha["data_atualizacao"].isoformat()])
+    buffer.seek(0)
+
+    cursor = db.session.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            "COPY documentos (categoria_id, nome, status_bucket, data_criacao, data_atualizacao) "
+            "FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+    finally:
+        cursor.close()
+
+
+def gravar_lote(lote):
+    """Grava um lote de clientes numa transação. Retorna (categorias, documentos) inseridos."""
+    agora = datetime.utcnow()
+    tabela_clientes = Cliente.__table__
+    tabela_categorias = Categoria.__table__
+
+    # 1. Clientes: upsert pelo id. Linhas iguais às do banco não são tocadas; as
+    #    alteradas ganham nova versão (novo ETag) no mesmo UPDATE
+    insercao = _insert(tabela_clientes)
+    db.session.execute(
+        insercao.on_conflict_do_update(
+            index_elements=[tabela_clientes.c.id],
+            set_={
+                "nome": insercao.excluded.nome,
+                "grupo": insercao.excluded.grupo,
+                "segmento": insercao.excluded.segmento,
+                "versao": tabela_clientes.c.versao + 1,
+            },
+            where=or_(
+                tabela_clientes.c.nome != insercao.excluded.nome,
+                tabela_clientes.c.grupo != insercao.excluded.grupo,
+                tabela_clientes.c.segmento != insercao.excluded.segmento,
+            ),
+        ),
+        # Um mesmo id repetido no lote quebraria o upsert de várias linhas: vale o último
+        list({
+            c["id"]: {"id": c["id"], "nome": c["nome"], "grupo": c["grupo"], "segmento": c["segmento"]}
+            for c in lote
+        }.values()),
+    )
+
+    # 2. Categorias: só as que ainda não existem (o ON CONFLICT cobre importações simultâneas)
+    ids_clientes = [c["id"] for c in lote]
+    existentes = set(
+        tuple(linha) for linha in db.session.query(Categoria.cliente_id, Categoria.nome_categoria)
+        .filter(Categoria.cliente_id.in_(ids_clientes))
+    )
+    categorias = []
+    for c in lote:
+        for cat in c["categorias"]:
+            chave = (c["id"], cat["nome"])
+            if chave in existentes:
+                continue
+            existentes.add(chave)
+            categorias.append({
+                "cliente_id": c["id"],
+                "nome_categoria": cat["nome"],
+                "status_recebimento": cat.get("status_recebimento", "PENDENTE"),
+                "data_atualizacao": agora,
+            })
+    if categorias:
+        db.session.execute(
+            _insert(tabela_categorias).on_conflict_do_nothing(
+                index_elements=[tabela_categorias.c.cliente_id, tabela_categorias.c.nome_categoria]
+            ),
+            categorias,
+        )
+
+    # 3. Ids das categorias do lote e documentos que já existem
+    ids_categorias = dict(
+        ((cliente_id, nome), categoria_id)
+        for categoria_id, cliente_id, nome in db.session.query(
+            Categoria.id, Categoria.cliente_id, Categoria.nome_categoria
+        ).filter(Categoria.cliente_id.in_(ids_clientes))
+    )
+    existentes = set(
+        tuple(linha) for linha in db.session.query(Documento.categoria_id, Documento.nome)
+        .join(Categoria, Categoria.id == Documento.categoria_id)
+        .filter(Categoria.cliente_id.in_(ids_clientes))
+    )
+
+    # 4. Documentos novos
+    documentos = []
+    for c in lote:
+        for cat in c["categorias"]:
+            categoria_id = ids_categorias[(c["id"], cat["nome"])]
+            for nome in cat.get("documentos", []):
+                if (categoria_id, nome) in existentes:
+                    continue
+                existentes.add((categoria_id, nome))
+                documentos.append({
+                    "categoria_id": categoria_id,
+                    "nome": nome,
+                    "status_bucket": "Não",
+                    "data_criacao": agora,
+                    "data_atualizacao": agora,
+                })
+
+    if documentos:
+        if db.engine.dialect.name == "postgresql":
+            _copiar_documentos(documentos)
+        else:
+            db.session.execute(Documento.__table__.insert(), documentos)
+
+    # Nova versão só dos clientes que ganharam categorias ou documentos: os
+    # demais mantêm os ETags (e as respostas em cache) de antes da importação
+    cliente_da_categoria = {categoria_id: cliente_id for (cliente_id, _), categoria_id in ids_categorias.items()}
+    alterados = {cat["cliente_id"] for cat in categorias} | \
+        {cliente_da_categoria[doc["categoria_id"]] for doc in documentos}
+    if alterados:
+        db.session.execute(
+            update(Cliente).where(Cliente.id.in_(alterados)).values(versao=Cliente.versao + 1)
+        )
+
+    db.session.commit()
+    return len(categorias), len(documentos)
+
+
+def _ajustar_sequencia():
+    """No PostgreSQL, avança a sequência de clientes.id depois de inserir ids explícitos."""
+    if db.engine.dialect.name == "postgresql":
+        db.session.execute(text(
+            "SELECT setval(pg_get_serial_sequence('clientes', 'id'), "
+            "(SELECT COALESCE(MAX(id), 1) FROM clientes))"
+        ))
+        db.session.commit()
+
+
+def _abrir(caminho, formato):
+    return open(caminho, "r", encoding="utf-8", newline="" if formato == "csv" else None)
+
+
+def _normalizar_nome(nome):
+    return " ".join(str(nome).split()).casefold()
+
+
+def verificar_identificadores(caminho, formato, permitir_renomear=False):
+    """
+    Confere os ids dos dados mestres com os clientes já gravados, antes de qualquer
+    escrita (uma leitura a mais do arquivo, guardando só id e nome).
+    Levanta ValueError se:
+      - um id do arquivo já existe no banco com outro nome (o upsert renomearia um
+        cliente diferente, que ficaria com as categorias do antigo). Renomeações
+        legítimas podem ser aceitas com permitir_renomear=True;
+      - um nome do arquivo já existe no banco com outro id (o cliente seria duplicado).
+    """
+    existentes = {}  # id -> nome normalizado
+    por_nome = {}    # nome normalizado -> ids
+    for cliente_id, nome in db.session.query(Cliente.id, Cliente.nome):
+        existentes[cliente_id] = _normalizar_nome(nome)
+        por_nome.setdefault(_normalizar_nome(nome), set()).add(cliente_id)
+    if not existentes:
+        return
+
+    renomeados, duplicados = [], []
+    with _abrir(caminho, formato) as arquivo:
+        for cliente in LEITORES[formato](arquivo):
+            cliente_id, nome = cliente["id"], _normalizar_nome(cliente["nome"])
+            if cliente_id in existentes and existentes[cliente_id] != nome:
+                renomeados.append(f"id {cliente_id}: '{existentes[cliente_id]}' no banco, '{nome}' no arquivo")
+            ids_do_nome = por_nome.get(nome)
+            if ids_do_nome and cliente_id not in ids_do_nome:
+                duplicados.append(f"'{nome}': id {min(ids_do_nome)} no banco, {cliente_id} no arquivo")
+
+    problemas = duplicados + ([] if permitir_renomear else renomeados)
+    if problemas:
+        raise ValueError(
+            f"Os ids dos dados mestres não correspondem aos clientes do banco "
+            f"({len(duplicados)} nomes com outro id, {len(renomeados)} ids com outro nome). "
+            f"Nada foi gravado. Exemplos:\n  " + "\n  ".join(problemas[:10])
+        )
+
+
+def importar(caminho, formato=None, tamanho_lote=1000, permitir_renomear=False):
+    """Importa o arquivo e retorna um dicionário com os totais."""
+    formato = formato or caminho.rsplit(".", 1)[-1].lower()
+    if formato not in LEITORES:
+        raise ValueError(f"Formato não suportado: '{formato}'")
+
+    totais = {"clientes": 0, "categorias": 0, "documentos": 0}
+    inicio = time.perf_counter()
+
+    with app.app_context():
+        db.create_all()
+        verificar_identificadores(caminho, formato, permitir_renomear)
+
+        with _abrir(caminho, formato) as arquivo:
+            lote = []
+            for cliente in LEITORES[formato](arquivo):
+                lote.append(cliente)
+                if len(lote) >= tamanho_lote:
+                    _gravar_e_reportar(lote, totais, inicio)
+                    lote = []
+            if lote:
+                _gravar_e_reportar(lote, totais, inicio)
+
+        _ajustar_sequencia()
+
+    totais["segundos"] = time.perf_counter() - inicio
+    return totais
+
+
+def _gravar_e_reportar(lote, totais, inicio):
+    categorias, documentos = gravar_lote(lote)
+    totais["clientes"] += len(lote)
+    totais["categorias"] += categorias
+    totais["documentos"] += documentos
+
+    decorrido = time.perf_counter() - inicio
+    linhas = totais["clientes"] + totais["categorias"] + totais["documentos"]
+    print(f">>> {totais['clientes']} clientes, {totais['categorias']} categorias e "
+          f"{totais['documentos']} documentos novos ({linhas / decorrido:,.0f} linhas/s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Importa os dados mestres (JSON, NDJSON ou CSV).")
+    parser.add_argument("arquivo", help="Caminho do arquivo (ex.: data/dados_mestres.json)")
+    parser.add_argument("--formato", choices=sorted(LEITORES), help="Força o formato (padrão: pela extensão)")
+    parser.add_argument("--lote", type=int, default=1000, help="Clientes por lote/transação (padrão: 1000)")
+    parser.add_argument("--permitir-renomear", action="store_true",
+                        help="Aceita ids já existentes com outro nome (renomeação nos dados mestres)")
+    args = parser.parse_args()
+
+    try:
+        totais = importar(args.arquivo, args.formato, args.lote, args.permitir_renomear)
+    except ValueError as e:
+        raise SystemExit(f"ERRO: {e}")
+    linhas = totais["clientes"] + totais["categorias"] + totais["documentos"]
+    print(f">>> Importação concluída em {totais['segundos']:.1f}s "
+          f"({linhas / max(totais['segundos'], 1e-9):,.0f} linhas/s).")
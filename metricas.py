@@ -0,0 +1,276 @@
+# metricas.py
+"""
+Instrumentação das requisições: latência, consultas ao banco (quantidade e
+tempo), tempo de serialização JSON e tamanho da resposta, por rota.
+
+- Os eventos do SQLAlchemy (before/after_cursor_execute) contam as consultas
+  da requisição atual; os hooks do Flask fecham as medidas ao fim dela.
+- GET /metrics expõe tudo no formato texto do Prometheus. Exige o token
+  fixo de instalar(token=...) (para o coletor) ou, sem ele, um JWT do app.
+- Requisições acima do orçamento de consultas geram um aviso no log
+  (é assim que um N+1 aparece).
+- capturar_consultas() / verificar_orcamento() servem para scripts de
+  verificação e testes afirmarem o orçamento de consultas de cada rota.
+"""
+import hmac
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import Response, g, has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+from flask_jwt_extended import jwt_required
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+BUCKETS_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+BUCKETS_CONSULTAS = (0, 1, 2, 5, 10, 20, 50, 100)
+BUCKETS_BYTES = (1024, 10 * 1024, 100 * 1024, 1024 * 1024, 10 * 1024 * 1024)
+
+_capturas = threading.local()
+
+
+class _Histograma:
+    __slots__ = ("limites", "contagens", "soma", "total")
+
+    def __init__(self, limites):
+        self.limites = limites
+        self.contagens = [0] * len(limites)
+        self.soma = 0.0
+        self.total = 0
+
+    def observar(self, valor):
+        self.soma += valor
+        self.total += 1
+        for i, limite in enumerate(self.limites):
+            if valor <= limite:
+                self.contagens[i] += 1
+
+
+class _MetricasRota:
+    __slots__ = ("latencia", "consultas", "bytes", "db_segundos", "serializacao_segundos",
+                 "por_status", "acima_orcamento")
+
+    def __init__(self):
+        self.latencia = _Histograma(BUCKETS_SEGUNDOS)
+        self.consultas = _Histograma(BUCKETS_CONSULTAS)
+        self.bytes = _Histograma(BUCKETS_BYTES)
+        self.db_segundos = 0.0
+        self.serializacao_segundos = 0.0
+        self.por_status = {}
+        self.acima_orcamento = 0
+
+
+def _rotulos(**rotulos):
+    itens = ",".join(f'{nome}="{str(valor).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+                     for nome, valor in rotulos.items())
+    return "{" + itens + "}"
+
+
+class Metricas:
+    """Registro das métricas por (rota, método). Seguro para uso entre threads."""
+
+    def __init__(self, orcamento_consultas=20, prefixo="checklist"):
+        self.orcamento_consultas = orcamento_consultas
+        self.prefixo = prefixo
+        self._rotas = {}
+        self._coletores = {}
+        self._trava = threading.Lock()
+
+    def registrar_coletor(self, nome, funcao):
+        """Inclui no /metrics os valores numéricos do dicionário retornado por 'funcao' (ex.: estatísticas de cache)."""
+        self._coletores[nome] = funcao
+
+    def registrar(self, rota, metodo, status, segundos, consultas, db_segundos, serializacao_segundos, tamanho):
+        with self._trava:
+            metricas = self._rotas.get((rota, metodo))
+            if metricas is None:
+                metricas = self._rotas[(rota, metodo)] = _MetricasRota()
+            metricas.latencia.observar(segundos)
+            metricas.consultas.observar(consultas)
+            metricas.bytes.observar(tamanho)
+            metricas.db_segundos += db_segundos
+            metricas.serializacao_segundos += serializacao_segundos
+            metricas.por_status[status] = metricas.por_status.get(status, 0) + 1
+            if consultas > self.orcamento_consultas:
+                metricas.acima_orcamento += 1
+
+    def _linhas_histograma(self, nome, rotulos, histograma):
+        for limite, contagem in zip(histograma.limites, histograma.contagens):
+            yield f"{nome}_bucket{_rotulos(**rotulos, le=limite)} {contagem}"
+        yield f"{nome}_bucket{_rotulos(**rotulos, le='+Inf')} {histograma.total}"
+        yield f"{nome}_sum{_rotulos(**rotulos)} {histograma.soma}"
+        yield f"{nome}_count{_rotulos(**rotulos)} {histograma.total}"
+
+    def exportar(self):
+        """Texto no formato de exposição do Prometheus (versão 0.0.4)."""
+        p = self.prefixo
+        with self._trava:
+            rotas = sorted(self._rotas.items())
+            linhas = []
+
+            secoes = (
+                ("requisicao_segundos", "histogram", "Latência das requisições", lambda m: m.latencia),
+                ("requisicao_consultas_db", "histogram", "Consultas ao banco por requisição", lambda m: m.consultas),
+                ("resposta_bytes", "histogram", "Tamanho do corpo da resposta", lambda m: m.bytes),
+            )
+            for nome, tipo, ajuda, histograma in secoes:
+                linhas += [f"# HELP {p}_{nome} {ajuda}", f"# TYPE {p}_{nome} {tipo}"]
+                for (rota, metodo), metricas in rotas:
+                    linhas += self._linhas_histograma(f"{p}_{nome}", {"rota": rota, "metodo": metodo}, histograma(metricas))
+
+            contadores = (
+                ("db_segundos_total", "Tempo gasto em consultas ao banco", lambda m: m.db_segundos),
+                ("serializacao_json_segundos_total", "Tempo gasto serializando JSON", lambda m: m.serializacao_segundos),
+                ("acima_orcamento_consultas_total", "Requisições acima do orçamento de consultas", lambda m: m.acima_orcamento),
+            )
+            for nome, ajuda, valor in contadores:
+                linhas += [f"# HELP {p}_{nome} {ajuda}", f"# TYPE {p}_{nome} counter"]
+                for (rota, metodo), metricas in rotas:
+                    linhas.append(f"{p}_{nome}{_rotulos(rota=rota, metodo=metodo)} {valor(metricas)}")
+
+            linhas += [f"# HELP {p}_requisicoes_total Requisições por status",
+                       f"# TYPE {p}_requisicoes_total counter"]
+            for (rota, metodo), metricas in rotas:
+                for status, total in sorted(metricas.por_status.items()):
+                    linhas.append(f"{p}_requisicoes_total{_rotulos(rota=rota, metodo=metodo, status=status)} {total}")
+
+        for nome, funcao in sorted(self._coletores.items()):
+            try:
+                valores = funcao() or {}
+            except Exception:
+                continue
+            for chave, valor in sorted(valores.items()):
+                if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+                    linhas += [f"# TYPE {p}_{nome}_{chave} gauge", f"{p}_{nome}_{chave} {valor}"]
+
+        return "\n".join(linhas) + "\n"
+
+
+# ---------------------------------------------
+# CAPTURA DE CONSULTAS (EVENTOS DO SQLALCHEMY)
+# ---------------------------------------------
+
+def _antes_da_consulta(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("_metricas_inicio", []).append(time.perf_counter())
+
+
+def _depois_da_consulta(conn, cursor, statement, parameters, context, executemany):
+    inicios = conn.info.get("_metricas_inicio")
+    duracao = time.perf_counter() - inicios.pop() if inicios else 0.0
+
+    if has_request_context() and "_metricas" in g:
+        g._metricas["consultas"] += 1
+        g._metricas["db"] += duracao
+
+    for captura in getattr(_capturas, "ativas", ()):
+        captura.consultas.append(statement)
+        captura.db_segundos += duracao
+
+
+class CapturaConsultas:
+    def __init__(self):
+        self.consultas = []
+        self.db_segundos = 0.0
+
+    @property
+    def total(self):
+        return len(self.consultas)
+
+
+@contextmanager
+def capturar_consultas():
+    """Conta as consultas executadas nesta thread dentro do bloco 'with'."""
+    captura = CapturaConsultas()
+    ativas = getattr(_capturas, "ativas", None)
+    if ativas is None:
+        ativas = _capturas.ativas = []
+    ativas.append(captura)
+    try:
+        yield captura
+    finally:
+        ativas.remove(captura)
+
+
+def verificar_orcamento(cliente_http, metodo, url, maximo, **kwargs):
+    """
+    Faz a requisição com o test_client e falha (AssertionError) se ela executar
+    mais de 'maximo' consultas. Retorna a resposta.
+
+        verificar_orcamento(app.test_client(), "GET", "/api/clientes", 2, headers=headers)
+    """
+    with capturar_consultas() as captura:
+        resposta = cliente_http.open(url, method=metodo, **kwargs)
+    assert captura.total <= maximo, (
+        f"{metodo} {url} executou {captura.total} consultas (orçamento: {maximo}):\n" + "\n".join(captura.consultas)
+    )
+    return resposta
+
+
+# ---------------------------------------------
+# SERIALIZAÇÃO JSON
+# ---------------------------------------------
+
+class JSONProviderMedido(DefaultJSONProvider):
+    """JSON provider do Flask que soma o tempo de serialização da requisição atual."""
+
+    def dumps(self, obj, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            return super().dumps(obj, **kwargs)
+        finally:
+            if has_request_context() and "_metricas" in g:
+                g._metricas["serializacao"] += time.perf_counter() - inicio
+
+
+# ---------------------------------------------
+# INSTALAÇÃO NO APP
+# ---------------------------------------------
+
+def instalar(app, metricas, token=None):
+    """
+    Liga os eventos do SQLAlchemy, os hooks do Flask e a rota GET /metrics.
+    Com 'token', a rota exige 'Authorization: Bearer <token>'; sem ele, um JWT
+    válido, como as demais rotas. Nunca fica aberta.
+    """
+    if not event.contains(Engine, "before_cursor_execute", _antes_da_consulta):
+        event.listen(Engine, "before_cursor_execute", _antes_da_consulta)
+        event.listen(Engine, "after_cursor_execute", _depois_da_consulta)
+
+    app.json_provider_class = JSONProviderMedido
+    app.json = JSONProviderMedido(app)
+
+    @app.before_request
+    def _iniciar_medicao():
+        g._metricas = {"inicio": time.perf_counter(), "consultas": 0, "db": 0.0, "serializacao": 0.0}
+
+    @app.after_request
+    def _registrar_medicao(resposta):
+        dados = g.pop("_metricas", None)
+        if dados is None or request.endpoint == "metricas_prometheus":
+            return resposta
+
+        rota = request.url_rule.rule if request.url_rule else "desconhecida"
+        segundos = time.perf_counter() - dados["inicio"]
+        tamanho = 0 if resposta.is_streamed else (resposta.content_length or 0)
+
+        metricas.registrar(rota, request.method, resposta.status_code, segundos,
+                           dados["consultas"], dados["db"], dados["serializacao"], tamanho)
+
+        if dados["consultas"] > metricas.orcamento_consultas:
+            app.logger.warning(
+                "%s %s executou %d consultas (orçamento: %d, %.1f ms no banco)",
+                request.method, rota, dados["consultas"], metricas.orcamento_consultas, dados["db"] * 1000,
+            )
+        return resposta
+
+    def _metricas_prometheus():
+        # Em bytes: compare_digest recusa (TypeError) str com caracteres não ASCII
+        recebido = request.headers.get("Authorization", "").encode("utf-8")
+        if token and not hmac.compare_digest(recebido, f"Bearer {token}".encode("utf-8")):
+            return Response("Não autorizado\n", status=401, mimetype="text/plain")
+        return Response(metricas.exportar(), mimetype="text/plain; version=0.0.4; charset=utf-8")
+
+    if not token:
+        _metricas_prometheus = jwt_required()(_metricas_prometheus)
+    app.add_url_rule("/metrics", "metricas_prometheus", _metricas_prometheus, methods=["GET"])
@@ -0,0 +1,84 @@
+"""
+Migração: move as listas de documentos de Categoria.detalhes_documentos_json
+para a tabela 'documentos'.
+
+É idempotente: categorias que já possuem linhas em 'documentos' são puladas,
+então o comando pode ser executado quantas vezes for preciso (inclusive a cada
+deploy). Processa as categorias em lotes pela chave primária, com um commit
+por lote, para não carregar a tabela inteira na memória.
+
+Uso:
+    python migrar_documentos.py [--lote 500]
+"""
+import argparse
+import json
+from datetime import datetime
+
+from sqlalchemy import exists
+
+from app import app, db
+from models import Categoria, Documento
+
+
+def migrar_documentos(tamanho_lote=500):
+    """Executa a migração e retorna (categorias_migradas, documentos_criados)."""
+    categorias_migradas = 0
+    documentos_criados = 0
+    ultimo_id = 0
+
+    with app.app_context():
+        db.create_all() # Garante que a tabela 'documentos' exista
+
+        while True:
+            lote = (
+                db.session.query(Categoria.id, Categoria.detalhes_documentos_json)
+                .filter(
+                    Categoria.id > ultimo_id,
+                    Categoria.detalhes_documentos_json.isnot(None),
+                    ~exists().where(Documento.categoria_id == Categoria.id),
+                )
+                .order_by(Categoria.id)
+                .limit(tamanho_lote)
+                .all()
+            )
+            if not lote:
+                break
+
+            agora = datetime.utcnow()
+            linhas = []
+            for categoria_id, documentos_json in lote:
+                try:
+                    nomes = json.loads(documentos_json)
+                except ValueError:
+                    print(f"AVISO: JSON inválido na categoria {categoria_id}. Pulando.")
+                    continue
+                if not nomes:
+                    continue
+                for nome in nomes:
+                    linhas.append({
+                        "categoria_id": categoria_id,
+                        "nome": nome,
+                        "status_bucket": "Não",
+                        "data_criacao": agora,
+                        "data_atualizacao": agora,
+                    })
+                categorias_migradas += 1
+
+            if linhas:
+                db.session.execute(Documento.__table__.insert(), linhas)
+            db.session.commit()
+
+            documentos_criados += len(linhas)
+            ultimo_id = lote[-1][0]
+            print(f">>> Lote até a categoria {ultimo_id}: {len(linhas)} documentos.")
+
+    return categorias_migradas, documentos_criados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migra os documentos em JSON para a tabela 'documentos'.")
+    parser.add_argument("--lote", type=int, default=500, help="Categorias por lote (padrão: 500)")
+    args = parser.parse_args()
+
+    categorias, documentos = migrar_documentos(args.lote)
+    print(f">>> Migração concluída: {categorias} categorias, {documentos} documentos criados.")
@@ -0,0 +1,41 @@
+"""
+Migração: cria os índices de clientes.grupo e clientes.segmento (filtros de
+GET /api/clientes).
+
+db.create_all() só cria índices junto com tabelas novas; numa tabela clientes
+já existente eles precisam ser criados aqui. É idempotente (IF NOT EXISTS).
+
+Uso:
+    python migrar_indices_clientes.py
+"""
+from sqlalchemy import inspect, text
+
+from app import app, db
+
+# Mesmos nomes que o SQLAlchemy dá a index=True em models.Cliente
+INDICES = {
+    "ix_clientes_grupo": "grupo",
+    "ix_clientes_segmento": "segmento",
+}
+
+
+def migrar_indices_clientes():
+    """Cria os índices que faltam. Retorna a lista dos índices criados."""
+    with app.app_context():
+        db.create_all() # Bancos novos já nascem com os índices
+
+        existentes = {indice["name"] for indice in inspect(db.engine).get_indexes("clientes")}
+        criados = [nome for nome in INDICES if nome not in existentes]
+
+        with db.engine.begin() as conexao:
+            for nome in criados:
+                conexao.execute(text(f"CREATE INDEX IF NOT EXISTS {nome} ON clientes ({INDICES[nome]})"))
+        return criados
+
+
+if __name__ == "__main__":
+    criados = migrar_indices_clientes()
+    if criados:
+        print(f">>> Índices criados: {', '.join(criados)}.")
+    else:
+        print(">>> Índices de clientes já existem. Nada a fazer.")
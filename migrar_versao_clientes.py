@@ -0,0 +1,32 @@
+"""
+Migração: adiciona a coluna clientes.versao (usada nos ETags da API).
+
+É idempotente: se a coluna já existe, nada é feito.
+
+Uso:
+    python migrar_versao_clientes.py
+"""
+from sqlalchemy import inspect, text
+
+from app import app, db
+
+
+def migrar_versao_clientes():
+    """Cria a coluna se necessário. Retorna True se a tabela foi alterada."""
+    with app.app_context():
+        db.create_all() # Bancos novos já nascem com a coluna
+
+        colunas = {coluna["name"] for coluna in inspect(db.engine).get_columns("clientes")}
+        if "versao" in colunas:
+            return False
+
+        with db.engine.begin() as conexao:
+            conexao.execute(text("ALTER TABLE clientes ADD COLUMN versao INTEGER NOT NULL DEFAULT 0"))
+        return True
+
+
+if __name__ == "__main__":
+    if migrar_versao_clientes():
+        print(">>> Coluna clientes.versao criada.")
+    else:
+        print(">>> Coluna clientes.versao já existe. Nada a fazer.")
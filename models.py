@@ -8,8 +8,11 @@ class Cliente(db.Model):
     __tablename__ = 'clientes'
     id = db.Column(db.Integer, primary_key=True)
     nome = db.Column(db.String(150), nullable=False)
-    grupo = db.Column(db.String(50), nullable=False)
-    segmento = db.Column(db.String(50), nullable=False)
+    grupo = db.Column(db.String(50), nullable=False, index=True)
+    segmento = db.Column(db.String(50), nullable=False, index=True)
+
+    # Incrementada a cada escrita nas categorias/documentos do cliente; gera os ETags da API
+    versao = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     
     # Relação com Categorias (lazy='dynamic' para consultas eficientes)
     categorias = db.relationship('Categoria', backref='cliente', lazy='dynamic')
@@ -24,9 +27,14 @@ class Categoria(db.Model):
     nome_categoria = db.Column(db.String(200), nullable=False)
     status_recebimento = db.Column(db.String(10), default='PENDENTE', nullable=False)
     
-    # Campo para armazenar os documentos como JSON string/Text
+    # Campo LEGADO: lista de documentos como JSON string/Text.
+    # Os documentos agora ficam na tabela 'documentos' (ver migrar_documentos.py);
+    # a coluna é mantida apenas como origem da migração.
     detalhes_documentos_json = db.Column(db.Text, nullable=True) 
 
+    # Relação com Documentos (lazy='dynamic' para consultas eficientes)
+    documentos = db.relationship('Documento', backref='categoria', lazy='dynamic')
+
     # Coluna para registrar a última atualização
     data_atualizacao = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -36,6 +44,35 @@ class Categoria(db.Model):
     def __repr__(self):
         return f'<Categoria {self.nome_categoria} Status: {self.status_recebimento}>'
 
+class Documento(db.Model):
+    __tablename__ = 'documentos'
+    id = db.Column(db.Integer, primary_key=True)
+    categoria_id = db.Column(db.Integer, db.ForeignKey('categorias.id'), nullable=False, index=True)
+    nome = db.Column(db.String(255), nullable=False, index=True)
+
+    # Coluna LEGADA da simulação do bucket. A API não a usa: o status exibido vem da
+    # verificação no armazenamento (ver bucket.py), ou 'Indisponível' se ele falhar.
+    status_bucket = db.Column(db.String(3), default='Não', nullable=False)
+
+    data_criacao = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    data_atualizacao = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<Documento {self.nome} Bucket: {self.status_bucket}>'
+
+class Usuario(db.Model):
+    __tablename__ = 'usuarios'
+    id = db.Column(db.Integer, primary_key=True)
+    username = db.Column(db.String(80), unique=True, nullable=False)
+
+    # Hash no formato do passlib (esquema e rounds ficam no próprio hash)
+    password_hash = db.Column(db.String(255), nullable=False)
+    ativo = db.Column(db.Boolean, default=True, nullable=False)
+    data_criacao = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f'<Usuario {self.username}>'
+
 # FUNÇÕES AUXILIARES PARA MANIPULAÇÃO DE DADOS JSON DENTRO DO MODELO
 
 def get_documentos(self):